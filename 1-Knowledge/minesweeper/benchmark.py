@@ -0,0 +1,179 @@
+import argparse
+import multiprocessing
+import random
+import statistics
+import time
+
+from minesweeper import ArrayMinesweeper, Minesweeper, MinesweeperAI
+
+# Board height, width and number of mines for each standard difficulty
+DIFFICULTIES = {
+    "beginner": (9, 9, 10),
+    "intermediate": (16, 16, 40),
+    "expert": (16, 30, 99),
+}
+
+# Number of points along each game at which knowledge base size is reported
+TIMELINE_POINTS = 10
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play Minesweeper games headlessly with MinesweeperAI."
+    )
+    parser.add_argument(
+        "difficulty", nargs="*", default=list(DIFFICULTIES),
+        help="beginner, intermediate, expert, or HEIGHTxWIDTHxMINES"
+    )
+    parser.add_argument("-n", "--games", type=int, default=1000)
+    parser.add_argument("-p", "--processes", type=int, default=None)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument(
+        "--array", action="store_true",
+        help="use the NumPy-backed board"
+    )
+    args = parser.parse_args()
+
+    for difficulty in args.difficulty:
+        height, width, mines = parse_difficulty(difficulty)
+        start = time.perf_counter()
+        games = play_games(
+            height, width, mines, args.games,
+            processes=args.processes, seed=args.seed, array=args.array
+        )
+        elapsed = time.perf_counter() - start
+        print(f"{difficulty} ({height}x{width}, {mines} mines)")
+        print_report(summarize(games), elapsed)
+
+
+def parse_difficulty(difficulty):
+    """
+    Return (height, width, mines) for a named difficulty, or for a
+    custom board written as HEIGHTxWIDTHxMINES.
+    """
+    if difficulty in DIFFICULTIES:
+        return DIFFICULTIES[difficulty]
+    try:
+        height, width, mines = (int(x) for x in difficulty.split("x"))
+    except ValueError:
+        raise SystemExit(f"Unknown difficulty: {difficulty}")
+    if not 0 <= mines < height * width:
+        raise SystemExit(f"Too many mines for board: {difficulty}")
+    return height, width, mines
+
+
+def play_game(height, width, mines, seed, array=False):
+    """
+    Play one game of Minesweeper with MinesweeperAI making every move.
+
+    Return a dictionary recording whether the game was won, the time
+    taken to choose and learn from each move, and the size of the AI's
+    knowledge base after each move.
+    """
+    random.seed(seed)
+    board = ArrayMinesweeper if array else Minesweeper
+    game = board(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+    safe_cells = height * width - mines
+
+    move_times = []
+    knowledge_sizes = []
+    revealed = 0
+    won = False
+    while True:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+        if move is None or game.is_mine(move):
+            break
+        ai.add_knowledge(move, game.nearby_mines(move))
+        move_times.append(time.perf_counter() - start)
+        knowledge_sizes.append(len(ai.solver.knowledge))
+
+        revealed += 1
+        if revealed == safe_cells:
+            won = True
+            break
+
+    return {
+        "won": won,
+        "move_times": move_times,
+        "knowledge_sizes": knowledge_sizes,
+    }
+
+
+def play_games(height, width, mines, n, processes=None, seed=0, array=False):
+    """
+    Play `n` games across a pool of worker processes. Game `i` is seeded
+    with `seed + i`, so results are reproducible for any number of workers.
+    """
+    tasks = [(height, width, mines, seed + i, array) for i in range(n)]
+    with multiprocessing.Pool(processes) as pool:
+        return pool.starmap(
+            play_game, tasks, chunksize=max(1, n // (8 * (processes or 8)))
+        )
+
+
+def summarize(games):
+    """
+    Combine per-game results into win rate, move timing and
+    knowledge base statistics.
+    """
+    wins = sum(game["won"] for game in games)
+    move_times = sorted(t for game in games for t in game["move_times"])
+
+    # Average knowledge base size at evenly spaced points through each game
+    timeline = [[] for _ in range(TIMELINE_POINTS)]
+    for game in games:
+        sizes = game["knowledge_sizes"]
+        for point in range(TIMELINE_POINTS):
+            if sizes:
+                timeline[point].append(
+                    sizes[(len(sizes) - 1) * point // (TIMELINE_POINTS - 1)]
+                )
+
+    def percentile(p):
+        return move_times[min(len(move_times) - 1, int(p * len(move_times)))]
+
+    return {
+        "games": len(games),
+        "wins": wins,
+        "win_rate": wins / len(games),
+        "moves": len(move_times),
+        "mean_move_time": statistics.fmean(move_times) if move_times else 0,
+        "median_move_time": percentile(0.5) if move_times else 0,
+        "p95_move_time": percentile(0.95) if move_times else 0,
+        "max_move_time": move_times[-1] if move_times else 0,
+        "knowledge_timeline": [
+            statistics.fmean(sizes) if sizes else 0 for sizes in timeline
+        ],
+        "max_knowledge": max(
+            (max(game["knowledge_sizes"], default=0) for game in games),
+            default=0
+        ),
+    }
+
+
+def print_report(summary, elapsed):
+    """
+    Print a summary produced by `summarize`.
+    """
+    games = summary["games"]
+    rate = summary["win_rate"]
+    error = (rate * (1 - rate) / games) ** 0.5
+    print(f"  Games: {games} in {elapsed:.2f}s")
+    print(f"  Win rate: {rate:.2%} ± {error:.2%} ({summary['wins']} won)")
+    print(f"  Moves: {summary['moves']}")
+    print("  Move time: "
+          f"mean {summary['mean_move_time'] * 1000:.3f}ms, "
+          f"median {summary['median_move_time'] * 1000:.3f}ms, "
+          f"p95 {summary['p95_move_time'] * 1000:.3f}ms, "
+          f"max {summary['max_move_time'] * 1000:.3f}ms")
+    timeline = ", ".join(f"{size:.1f}" for size in summary["knowledge_timeline"])
+    print(f"  Knowledge base size through game: {timeline}")
+    print(f"  Largest knowledge base: {summary['max_knowledge']}")
+
+
+if __name__ == "__main__":
+    main()
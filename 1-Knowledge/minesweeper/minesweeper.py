@@ -1,6 +1,17 @@
 import itertools
+import math
 import random
-import copy
+from collections import deque
+
+from solver import Solver, cells_in, grid_neighbors
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Largest group of connected frontier cells whose mine layouts are enumerated exactly
+ENUMERATION_LIMIT = 40
 
 
 class Minesweeper():
@@ -85,6 +96,84 @@ class Minesweeper():
         return self.mines_found == self.mines
 
 
+class ArrayMinesweeper(Minesweeper):
+    """
+    Minesweeper game representation backed by NumPy arrays,
+    for large boards and mass simulation
+    """
+
+    def __init__(self, height=8, width=8, mines=8, seed=None):
+        if np is None:
+            raise ImportError("ArrayMinesweeper requires numpy")
+
+        # Set initial width, height, and number of mines
+        self.height = height
+        self.width = width
+
+        # Place all mines with one sample of distinct cell indices, seeded
+        # from `random` by default so random.seed() still fixes the board
+        if seed is None:
+            seed = random.getrandbits(64)
+        rng = np.random.default_rng(seed)
+        positions = rng.choice(height * width, size=mines, replace=False)
+        self.board = np.zeros(height * width, dtype=bool)
+        self.board[positions] = True
+        self.board = self.board.reshape(height, width)
+        self.mines = set(
+            (int(i), int(j)) for i, j in zip(*np.divmod(positions, width))
+        )
+
+        # Count every cell's neighboring mines at once by convolving the
+        # board with a 3x3 window of ones, then removing the cell itself
+        padded = np.pad(self.board.astype(np.int8), 1)
+        self.counts = np.zeros((height, width), dtype=np.int8)
+        for di in range(3):
+            for dj in range(3):
+                self.counts += padded[di:di + height, dj:dj + width]
+        self.counts -= self.board
+
+        # At first, player has found no mines
+        self.mines_found = set()
+
+    def is_mine(self, cell):
+        i, j = cell
+        return bool(self.board[i, j])
+
+    def nearby_mines(self, cell):
+        """
+        Returns the number of mines that are
+        within one row and column of a given cell,
+        not including the cell itself.
+        """
+        i, j = cell
+        return int(self.counts[i, j])
+
+    def reveal(self, cell):
+        """
+        Reveals a safe cell. If it has no neighboring mines, every cell
+        connected to it through other such cells is revealed too, along
+        with the border of numbered cells around that region.
+
+        Returns a list of (cell, count) pairs for every revealed cell.
+        """
+        revealed = []
+        visited = np.zeros((self.height, self.width), dtype=bool)
+        visited[cell] = True
+        frontier = deque([cell])
+        while frontier:
+            i, j = frontier.popleft()
+            count = int(self.counts[i, j])
+            revealed.append(((i, j), count))
+            if count:
+                continue
+            for x in range(max(i - 1, 0), min(i + 2, self.height)):
+                for y in range(max(j - 1, 0), min(j + 2, self.width)):
+                    if not visited[x, y]:
+                        visited[x, y] = True
+                        frontier.append((x, y))
+        return revealed
+
+
 class Sentence():
     """
     Logical statement about a Minesweeper game
@@ -99,6 +188,9 @@ class Sentence():
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        return hash((frozenset(self.cells), self.count))
+
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
@@ -133,16 +225,82 @@ class Sentence():
         if cell in self.cells:
             self.cells.remove(cell)
 
+
+def count_configurations(cells, constraints):
+    """
+    Counts the ways of placing mines in `cells` so that every constraint,
+    a (cells, count) pair, holds.
+
+    Returns a list `totals` where totals[k] is the number of valid
+    configurations with k mines, and a dictionary mapping each cell to a
+    list of how many of the configurations with k mines contain that cell.
+    """
+    n = len(cells)
+    position = {cell: i for i, cell in enumerate(cells)}
+
+    # For each constraint, mines still needed and cells still unassigned
+    needed = [count for _, count in constraints]
+    unassigned = [len(constraint_cells) for constraint_cells, _ in constraints]
+    cell_constraints = [[] for _ in range(n)]
+    for c, (constraint_cells, _) in enumerate(constraints):
+        for cell in constraint_cells:
+            cell_constraints[position[cell]].append(c)
+
+    totals = [0] * (n + 1)
+    hits = [[0] * (n + 1) for _ in range(n)]
+    assignment = [False] * n
+
+    def search(i, mines):
+        if i == n:
+            totals[mines] += 1
+            for j in range(n):
+                if assignment[j]:
+                    hits[j][mines] += 1
+            return
+        for is_mine in (False, True):
+            if any(
+                needed[c] - is_mine < 0 or needed[c] - is_mine > unassigned[c] - 1
+                for c in cell_constraints[i]
+            ):
+                continue
+            for c in cell_constraints[i]:
+                needed[c] -= is_mine
+                unassigned[c] -= 1
+            assignment[i] = is_mine
+            search(i + 1, mines + is_mine)
+            for c in cell_constraints[i]:
+                needed[c] += is_mine
+                unassigned[c] += 1
+        assignment[i] = False
+
+    search(0, 0)
+    return totals, {cell: hits[i] for i, cell in enumerate(cells)}
+
+
+def convolve(a, b):
+    """
+    Returns the distribution of the total of two independent mine counts,
+    given the number of configurations for each count.
+    """
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                result[i + j] += x * y
+    return result
+
+
 class MinesweeperAI():
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=8):
 
-        # Set initial height and width
+        # Set initial height and width, and the number of mines on the board
         self.height = height
         self.width = width
+        self.total_mines = mines
 
         # Keep track of which cells have been clicked on
         self.moves_made = set()
@@ -151,26 +309,85 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Safe cells in the order they were found, which may include cells
+        # played since; make_safe_move skips those
+        self.safe_moves = deque()
+
+        # Cells not yet known to be safe or mines, kept in a list (with each
+        # cell's position in it) so removal and random choice are O(1)
+        self.unknown = [(i, j) for i in range(height) for j in range(width)]
+        self.unknown_index = {cell: k for k, cell in enumerate(self.unknown)}
+
+        # Inference engine, which numbers cell (i, j) as i * width + j
+        self.solver = Solver(grid_neighbors(height, width))
+
+        # Mine layout counts for each group of connected frontier cells,
+        # keyed by the sentences constraining the group
+        self.component_cache = dict()
+
+    @property
+    def knowledge(self):
+        """
+        Set of sentences about the game known to be true.
+        """
+        return set(
+            Sentence((self.cell_of(c) for c in cells_in(cells)), count)
+            for cells, count in self.solver.knowledge
+        )
+
+    def cell_id(self, cell):
+        """
+        Returns the solver's integer ID for a cell.
+        """
+        return cell[0] * self.width + cell[1]
+
+    def cell_of(self, cell_id):
+        """
+        Returns the cell with a given solver ID.
+        """
+        return divmod(cell_id, self.width)
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.record(cell, True)
+        self.solver.mark_mine(self.cell_id(cell))
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
-        self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        self.record(cell, False)
+        self.solver.mark_safe(self.cell_id(cell))
+
+    def record(self, cell, is_mine):
+        """
+        Updates the AI's own bookkeeping once a cell is known
+        to be a mine or safe.
+        """
+        if is_mine:
+            self.mines.add(cell)
+        else:
+            if cell not in self.safes and cell not in self.moves_made:
+                self.safe_moves.append(cell)
+            self.safes.add(cell)
+        self.remove_unknown(cell)
+
+    def remove_unknown(self, cell):
+        """
+        Removes a cell from the list of unknown cells by moving the last
+        unknown cell into its place.
+        """
+        k = self.unknown_index.pop(cell, None)
+        if k is None:
+            return
+        last = self.unknown.pop()
+        if k < len(self.unknown):
+            self.unknown[k] = last
+            self.unknown_index[last] = k
 
     def add_knowledge(self, cell, count):
         """
@@ -191,94 +408,10 @@ class MinesweeperAI():
         #Function 1
         self.moves_made.add(cell)
 
-        #Function 2
-        self.mark_safe(cell)
-
-        #Function 3
-        outercells = set()
-        row = cell[0]
-        col = cell[1]
-        
-        #Add surrounding cells to a set and create a sentence
-        for x in range(-1,2):
-            for y in range(-1,2):
-                if (row+x) >= 0 and (row+x) < self.height:
-                    if (col+y) >= 0 and (col+y) < self.width:
-                        if not(x==0 and y==0):
-                            outercells.add((row+x,col+y))
-
-        newsentence = Sentence(outercells,count)
-        
-        #Mark any mines in sentence
-        for mine in self.mines:
-            newsentence.mark_mine(mine)
-
-        #Mark any safes in sentence
-        for safe in self.safes:
-            newsentence.mark_safe(safe)
-
-        self.knowledge.append(newsentence)
-
-        #Function 4 & 5
-        #Use newknowledge to check if any new mines, safes of sentences have to be created, if so, repeat check
-        newknowledge = 1
-        tobeadded_mines = set()
-        tobeadded_safes = set()
-        tobeadded_sentences = []
-
-        while newknowledge > 0:
-            #reset variable
-            newknowledge = 0
-            
-            #check each sentence for mines and safes
-            tobeadded_mines.clear()
-            tobeadded_safes.clear()
-            
-            for sentence in self.knowledge:
-                #If sentence is empty, remove from knowledge base
-                if sentence.cells == set():
-                    self.knowledge.remove(sentence)
-                else:                        
-                    #if a mine exists (new mine, not already added), add it to set and mark as mine
-                    if sentence.known_mines() is not None:
-                        for mine in sentence.known_mines():
-                            if mine not in self.mines:
-                                tobeadded_mines.add(mine)
-
-                    #if a safe exists (new safe, not already added), add it to set and mark as safe                       
-                    if sentence.known_safes() is not None:
-                        for safe in sentence.known_safes():
-                            if safe not in self.safes:
-                                tobeadded_safes.add(safe)
-            #Mark new mines found
-            if len(tobeadded_mines) > 0:
-                for mine in tobeadded_mines:
-                    self.mark_mine(mine)
-                    newknowledge+=1
-            #Mark new safes found    
-            if len(tobeadded_safes) > 0:
-                for safe in tobeadded_safes:
-                    self.mark_safe(safe)
-                    newknowledge+=1
-
-            #Check if sentence two cells are contained in sentence one, if it does, subtract and add as new sentence
-            tobeadded_sentences.clear()
-            for sentenceone in self.knowledge:
-                for sentencetwo in self.knowledge:
-                    if sentenceone != sentencetwo and sentenceone.cells != set() and sentencetwo.cells != set():
-                        #Check if new sentence occurs in any existing sentences
-                        if sentenceone.cells.issuperset(sentencetwo.cells):
-                            cells_new = sentenceone.cells.difference(sentencetwo.cells)
-                            count_new = sentenceone.count - sentencetwo.count
-                            #If sentence isn't already in KB, add it to temp set
-                            if Sentence(cells_new, count_new) not in self.knowledge:
-                                tobeadded_sentences.append(Sentence(cells_new, count_new))
-            #Add sentences from temp set to KB                
-            if len(tobeadded_sentences) > 0:                
-                for sentence in tobeadded_sentences:
-                    self.knowledge.append(sentence)
-                    newknowledge += 1
-                
+        #Function 2-5, handled by the solver, which reports every cell it has newly concluded
+        for cell_id, is_mine in self.solver.observe([(self.cell_id(cell), count)]):
+            self.record(self.cell_of(cell_id), is_mine)
+
     def make_safe_move(self):
         """
         Returns a safe cell to choose on the Minesweeper board.
@@ -288,17 +421,13 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        possiblesafe = copy.deepcopy(self.safes)
-
-        while True:
+        #Drop safe cells that have been played since they were found
+        while self.safe_moves and self.safe_moves[0] in self.moves_made:
+            self.safe_moves.popleft()
 
-            if len(possiblesafe) == 0:
-                return None
-
-            possiblemove = possiblesafe.pop()
-
-            if possiblemove not in self.mines and possiblemove not in self.moves_made:
-                return possiblemove
+        if self.safe_moves:
+            return self.safe_moves[0]
+        return None
 
     def make_random_move(self):
         """
@@ -306,15 +435,150 @@ class MinesweeperAI():
         Should choose randomly among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+        Of those, picks the cell least likely to be a mine given the
+        knowledge base and the number of mines on the board, breaking
+        ties at random.
         """
         #If all safe moves have been made, return none
-        if (len(self.mines)+len(self.safes)) == (self.height*self.width):
+        if not self.unknown:
             return None
 
-        while True:
-            row = random.randint(0,self.height-1)
-            col = random.randint(0,self.width-1)
-            possiblemove = (row,col)
-            if (possiblemove not in self.mines) and (possiblemove not in self.moves_made):
-                return possiblemove
+        #Known safes that have not been played carry no risk
+        move = self.make_safe_move()
+        if move is not None:
+            return move
+
+        probabilities, interior = self.frontier_probabilities()
+        lowest = min(probabilities.values(), default=1)
+        tied = [
+            cell for cell, p in probabilities.items()
+            if p - lowest < 1e-9
+        ]
+
+        #Interior cells are at least as safe as the best frontier cells, so pick
+        #uniformly among every cell with the lowest risk
+        if interior is not None and interior < lowest + 1e-9:
+            interior_cells = len(self.unknown) - len(probabilities)
+            if (interior < lowest - 1e-9 or
+                    random.randrange(interior_cells + len(tied)) < interior_cells):
+                return self.random_interior_cell()
+        return random.choice(tied)
+
+    def random_interior_cell(self):
+        """
+        Returns a random unknown cell that no sentence mentions.
+        """
+        index = self.solver.cell_index
+        for _ in range(len(self.unknown)):
+            cell = random.choice(self.unknown)
+            if self.cell_id(cell) not in index:
+                return cell
+
+        #Interior is a small part of the unknown cells, so look through them all
+        return random.choice([
+            cell for cell in self.unknown if self.cell_id(cell) not in index
+        ])
+
+    def mine_probabilities(self):
+        """
+        Returns a dictionary mapping every cell not yet known to be safe or
+        a mine to the probability that it is a mine.
+        """
+        probabilities, interior = self.frontier_probabilities()
+        for cell in self.unknown:
+            if cell not in probabilities:
+                probabilities[cell] = interior
+        return probabilities
 
+    def frontier_probabilities(self):
+        """
+        Returns a dictionary mapping each cell mentioned in the knowledge
+        base to the probability that it is a mine, along with the
+        probability shared by every other unknown cell (None if there are
+        no such cells).
+
+        Mine layouts are enumerated separately for each group of connected
+        frontier cells, then weighted by how many ways the remaining mines
+        can be spread over the cells no sentence mentions.
+        """
+        remaining = self.total_mines - len(self.mines)
+
+        #Count layouts for each group, reusing counts for groups unchanged since the last move
+        solved = []
+        estimated = dict()
+        cache = dict()
+        for cells, sentences in self.solver.components():
+            key = frozenset(sentences)
+            if key in self.component_cache:
+                result = self.component_cache[key]
+            elif len(cells) <= ENUMERATION_LIMIT:
+                result = count_configurations(cells, [
+                    (list(cells_in(sentence_cells)), count)
+                    for sentence_cells, count in sentences
+                ])
+            else:
+                #Too large to enumerate, so fall back on the riskiest sentence for each cell
+                result = None
+                for cell in cells:
+                    estimated[cell] = max(
+                        count / sentence_cells.bit_count()
+                        for sentence_cells, count in self.solver.cell_index[cell]
+                    )
+            if result is not None:
+                cache[key] = result
+                solved.append(result)
+        self.component_cache = cache
+
+        frontier = set(estimated)
+        for _, hits in solved:
+            frontier.update(hits)
+        interior = len(self.unknown) - len(frontier)
+        remaining -= round(sum(estimated.values()))
+
+        #Number of ways to place the rest of the mines away from the frontier
+        def spread(frontier_mines):
+            rest = remaining - frontier_mines
+            return math.comb(interior, rest) if 0 <= rest <= interior else 0
+
+        #Distribution of frontier mines with and without each group
+        prefix = [[1]]
+        for totals, _ in solved:
+            prefix.append(convolve(prefix[-1], totals))
+        suffix = [[1]]
+        for totals, _ in reversed(solved):
+            suffix.append(convolve(suffix[-1], totals))
+        suffix.reverse()
+
+        everything = prefix[-1]
+        weight = sum(count * spread(k) for k, count in enumerate(everything))
+        use_mine_count = weight > 0
+        if not use_mine_count:
+            #Mine count is inconsistent with the knowledge base, so ignore it
+            def spread(frontier_mines):
+                return 1
+            weight = sum(everything)
+
+        probabilities = dict()
+        for i, (totals, hits) in enumerate(solved):
+            others = convolve(prefix[i], suffix[i + 1])
+            weights = [
+                sum(count * spread(k + j) for j, count in enumerate(others))
+                for k in range(len(totals))
+            ]
+            for cell, cell_hits in hits.items():
+                probabilities[self.cell_of(cell)] = sum(
+                    h * w for h, w in zip(cell_hits, weights)
+                ) / weight
+        for cell, p in estimated.items():
+            probabilities[self.cell_of(cell)] = p
+
+        if not interior:
+            return probabilities, None
+        if use_mine_count:
+            expected = sum(
+                count * spread(k) * (remaining - k)
+                for k, count in enumerate(everything)
+            ) / weight
+        else:
+            expected = max(remaining - sum(probabilities.values()), 0)
+        return probabilities, expected / interior
@@ -0,0 +1,200 @@
+from collections import deque
+
+
+def grid_neighbors(height, width):
+    """
+    Returns a list mapping each cell ID of a height x width board to the
+    bitset of its neighboring cell IDs. Cell (i, j) has ID i * width + j.
+    """
+    neighbors = []
+    for i in range(height):
+        for j in range(width):
+            bits = 0
+            for x in range(max(i - 1, 0), min(i + 2, height)):
+                for y in range(max(j - 1, 0), min(j + 2, width)):
+                    if (x, y) != (i, j):
+                        bits |= 1 << (x * width + y)
+            neighbors.append(bits)
+    return neighbors
+
+
+def cells_in(bits):
+    """
+    Yields the cell IDs in a bitset, lowest first.
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class Solver():
+    """
+    Minesweeper inference engine, independent of any game.
+
+    Cells are integer IDs, and a sentence is a frozen (cells, count) pair
+    where `cells` is a bitset (a Python int with bit k set for cell k)
+    and `count` is how many of those cells are mines.
+    """
+
+    def __init__(self, neighbors):
+
+        # Bitset of neighboring cells for each cell ID
+        self.neighbors = neighbors
+
+        # Cells known to be safe or mines
+        self.mines = set()
+        self.safes = set()
+
+        # Set of sentences known to be true, indexed by the cells each mentions
+        self.knowledge = set()
+        self.cell_index = dict()
+
+        # Sentences added or changed since inference last ran
+        self.pending = deque()
+
+        # Cells found safe or mines during the current observation,
+        # as (cell, is_mine) pairs in the order they were found
+        self.learned = []
+
+    def observe(self, observations):
+        """
+        Learns from many revealed cells at once, each given as a
+        (cell, count) pair where `count` is its number of neighboring mines.
+
+        Returns the list of (cell, is_mine) pairs newly concluded,
+        including the observed cells themselves.
+        """
+        self.learned = []
+        observations = list(observations)
+
+        # Mark every revealed cell safe first, so no sentence mentions them
+        for cell, _ in observations:
+            self.mark_safe(cell)
+
+        for cell, count in observations:
+            cells = 0
+            for neighbor in cells_in(self.neighbors[cell]):
+                if neighbor in self.mines:
+                    count -= 1
+                elif neighbor not in self.safes:
+                    cells |= 1 << neighbor
+            self.add_sentence((cells, count))
+
+        self.infer()
+        return self.learned
+
+    def mark_mine(self, cell):
+        """
+        Marks a cell as a mine, and removes it from every sentence.
+        """
+        if cell in self.mines:
+            return
+        self.mines.add(cell)
+        self.learned.append((cell, True))
+        bit = 1 << cell
+        for cells, count in self.cell_index.pop(cell, ()):
+            self.remove_sentence((cells, count))
+            self.add_sentence((cells & ~bit, count - 1))
+
+    def mark_safe(self, cell):
+        """
+        Marks a cell as safe, and removes it from every sentence.
+        """
+        if cell in self.safes:
+            return
+        self.safes.add(cell)
+        self.learned.append((cell, False))
+        bit = 1 << cell
+        for cells, count in self.cell_index.pop(cell, ()):
+            self.remove_sentence((cells, count))
+            self.add_sentence((cells & ~bit, count))
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base and queues it for inference.
+        Empty sentences and sentences already known are ignored.
+        """
+        cells, _ = sentence
+        if not cells or sentence in self.knowledge:
+            return
+        self.knowledge.add(sentence)
+        for cell in cells_in(cells):
+            self.cell_index.setdefault(cell, set()).add(sentence)
+        self.pending.append(sentence)
+
+    def remove_sentence(self, sentence):
+        """
+        Removes a sentence from the knowledge base.
+        """
+        self.knowledge.discard(sentence)
+        for cell in cells_in(sentence[0]):
+            sentences = self.cell_index.get(cell)
+            if sentences is not None:
+                sentences.discard(sentence)
+                if not sentences:
+                    del self.cell_index[cell]
+
+    def infer(self):
+        """
+        Draws conclusions from every queued sentence until nothing new
+        can be learned. Each sentence is only compared against the
+        sentences that share a cell with it.
+        """
+        while self.pending:
+            sentence = self.pending.popleft()
+            if sentence not in self.knowledge:
+                continue
+            cells, count = sentence
+
+            # Every cell is a mine, or every cell is safe
+            if count == cells.bit_count():
+                for cell in cells_in(cells):
+                    self.mark_mine(cell)
+                continue
+            if count == 0:
+                for cell in cells_in(cells):
+                    self.mark_safe(cell)
+                continue
+
+            # If one sentence's cells are a subset of another's, the difference is a new sentence
+            overlapping = set()
+            for cell in cells_in(cells):
+                overlapping.update(self.cell_index[cell])
+            overlapping.discard(sentence)
+            for other_cells, other_count in overlapping:
+                common = cells & other_cells
+                if common == other_cells:
+                    self.add_sentence((cells & ~other_cells, count - other_count))
+                elif common == cells:
+                    self.add_sentence((other_cells & ~cells, other_count - count))
+
+    def components(self):
+        """
+        Splits the cells mentioned in the knowledge base into groups that
+        share no sentences, so each group can be solved independently.
+        Returns a list of (cells, sentences) pairs, with cells in
+        breadth-first order so neighboring cells are assigned together.
+        """
+        groups = []
+        seen = set()
+        for start in self.cell_index:
+            if start in seen:
+                continue
+            seen.add(start)
+            cells = []
+            sentences = set()
+            frontier = deque([start])
+            while frontier:
+                cell = frontier.popleft()
+                cells.append(cell)
+                for sentence in self.cell_index[cell]:
+                    if sentence in sentences:
+                        continue
+                    sentences.add(sentence)
+                    for other in cells_in(sentence[0]):
+                        if other not in seen:
+                            seen.add(other)
+                            frontier.append(other)
+            groups.append((cells, sentences))
+        return groups
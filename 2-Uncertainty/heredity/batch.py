@@ -0,0 +1,133 @@
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from heredity import METHODS, load_data
+from memo import CACHE_SIZE, StructureCache, signature, solve_structure
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute gene and trait distributions for many family files."
+    )
+    parser.add_argument(
+        "inputs", nargs="+",
+        help="family CSV files, directories of them, or glob patterns"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="file to write results to, as JSON if it ends in .json and "
+             "CSV otherwise (default: CSV to standard output)"
+    )
+    parser.add_argument(
+        "-m", "--method", choices=list(METHODS), default="elimination"
+    )
+    parser.add_argument("-p", "--processes", type=int, default=None)
+    parser.add_argument(
+        "-c", "--cache",
+        help="file to keep solved family shapes in between runs"
+    )
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    args = parser.parse_args()
+
+    filenames = family_files(args.inputs)
+    if not filenames:
+        sys.exit("No family files found")
+
+    start = time.perf_counter()
+    cache = StructureCache(args.cache_size, args.cache)
+    results, structures = run_batch(filenames, args.method, args.processes, cache)
+    cache.save()
+    elapsed = time.perf_counter() - start
+
+    if args.output is None:
+        write_csv(results, sys.stdout)
+    elif args.output.endswith(".json"):
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        with open(args.output, "w", newline="") as f:
+            write_csv(results, f)
+    print(f"{len(filenames)} families ({structures} distinct shapes, "
+          f"{cache.hits} cached) in {elapsed:.2f}s", file=sys.stderr)
+
+
+def family_files(inputs):
+    """
+    Return the sorted list of family CSV files named by `inputs`, each of
+    which is a file, a directory whose .csv files are all included, or a
+    glob pattern.
+    """
+    filenames = set()
+    for name in inputs:
+        if os.path.isdir(name):
+            filenames.update(glob.glob(os.path.join(name, "*.csv")))
+        elif os.path.isfile(name):
+            filenames.add(name)
+        else:
+            filenames.update(glob.glob(name, recursive=True))
+    return sorted(filenames)
+
+
+def run_batch(filenames, method="elimination", processes=None, cache=None):
+    """
+    Compute gene and trait distributions for every family file.
+
+    Families are reduced to their signature first, so each distinct shape
+    is only solved once however many files share it, and shapes found in
+    `cache` (a StructureCache) are not solved at all. The rest are solved
+    across a pool of worker processes and added to the cache.
+
+    Return a dictionary mapping each filename to its distributions, in the
+    form heredity.main prints, and the number of distinct shapes.
+    """
+    families = dict()
+    for filename in filenames:
+        families[filename] = signature(load_data(filename))
+
+    solved = dict()
+    for _, structure in families.values():
+        if structure not in solved:
+            solved[structure] = None if cache is None else cache.get((method, structure))
+
+    missing = [structure for structure, found in solved.items() if found is None]
+    if missing:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.starmap(
+                solve_structure, [(structure, method) for structure in missing],
+                chunksize=max(1, len(missing) // (8 * (processes or os.cpu_count()))),
+            )
+        for structure, distributions in zip(missing, results):
+            solved[structure] = distributions
+            if cache is not None:
+                cache.put((method, structure), distributions)
+
+    results = dict()
+    for filename, (names, structure) in families.items():
+        results[filename] = dict(zip(names, solved[structure]))
+    return results, len(solved)
+
+
+def write_csv(results, f):
+    """
+    Write results from `run_batch` as CSV, with one row for each person in
+    each family.
+    """
+    writer = csv.writer(f)
+    writer.writerow(["file", "name", "gene_0", "gene_1", "gene_2", "trait"])
+    for filename, probabilities in results.items():
+        for person, distributions in probabilities.items():
+            genes = distributions["gene"]
+            writer.writerow([
+                filename, person,
+                genes[0], genes[1], genes[2], distributions["trait"][True]
+            ])
+
+
+if __name__ == "__main__":
+    main()
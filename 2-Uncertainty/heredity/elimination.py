@@ -0,0 +1,221 @@
+import heapq
+import itertools
+
+# Number of copies of the gene a person can have
+GENES = (0, 1, 2)
+
+
+class Factor():
+    """
+    Table of non-negative values over every assignment of gene counts to
+    a tuple of people. `table` maps a tuple of gene counts, one for each
+    person in `variables`, to a value.
+    """
+
+    def __init__(self, variables, table):
+        self.variables = tuple(variables)
+        self.table = table
+
+    def __mul__(self, other):
+        variables = self.variables + tuple(
+            v for v in other.variables if v not in self.variables
+        )
+        left = [variables.index(v) for v in self.variables]
+        right = [variables.index(v) for v in other.variables]
+        table = dict()
+        for genes in itertools.product(GENES, repeat=len(variables)):
+            table[genes] = (
+                self.table[tuple(genes[i] for i in left)]
+                * other.table[tuple(genes[i] for i in right)]
+            )
+        return Factor(variables, table)
+
+    def sum_out(self, keep):
+        """
+        Return the factor over the variables in `keep`, summing over every
+        other variable, scaled so its values add to 1.
+        """
+        variables = tuple(v for v in self.variables if v in keep)
+        positions = [self.variables.index(v) for v in variables]
+        table = dict.fromkeys(itertools.product(GENES, repeat=len(variables)), 0)
+        for genes, value in self.table.items():
+            table[tuple(genes[i] for i in positions)] += value
+
+        # Scaling keeps long products from underflowing; marginals are
+        # normalized at the end, so it does not change them
+        total = sum(table.values())
+        if total:
+            for genes in table:
+                table[genes] /= total
+        return Factor(variables, table)
+
+
+def product(factors):
+    """
+    Return the product of a list of factors.
+    """
+    result = Factor((), {(): 1})
+    for factor in factors:
+        result = result * factor
+    return result
+
+
+def inheritance(mother_genes, father_genes, mutation):
+    """
+    Return a dictionary mapping each gene count a child can have to its
+    probability, given their mother's and father's gene counts.
+    """
+    # Probability of passing the gene on, given the parent's gene count
+    passes = {0: mutation, 1: 0.5, 2: 1 - mutation}
+    from_mother = passes[mother_genes]
+    from_father = passes[father_genes]
+    return {
+        0: (1 - from_mother) * (1 - from_father),
+        1: from_mother * (1 - from_father) + (1 - from_mother) * from_father,
+        2: from_mother * from_father,
+    }
+
+
+def family_factors(people, probs):
+    """
+    Return one factor for each person in the family network, over that
+    person's gene count and their parents' gene counts.
+
+    Traits are summed out straight away: a known trait multiplies each gene
+    count by the probability of showing that trait, and an unknown trait
+    contributes nothing, since its probabilities add to 1.
+    """
+    factors = []
+    for person, data in people.items():
+        trait = data["trait"]
+        evidence = {
+            genes: 1 if trait is None else probs["trait"][genes][trait]
+            for genes in GENES
+        }
+
+        if data["mother"] is None and data["father"] is None:
+            factors.append(Factor((person,), {
+                (genes,): probs["gene"][genes] * evidence[genes] for genes in GENES
+            }))
+            continue
+
+        table = dict()
+        for mother, father in itertools.product(GENES, repeat=2):
+            inherit = inheritance(mother, father, probs["mutation"])
+            for genes in GENES:
+                table[(genes, mother, father)] = inherit[genes] * evidence[genes]
+        factors.append(Factor((person, data["mother"], data["father"]), table))
+    return factors
+
+
+def elimination_order(factors):
+    """
+    Return an order in which to eliminate every variable, always choosing
+    the variable with the fewest neighbors left (ties broken by name) so
+    the factors created along the way stay small.
+    """
+    neighbors = dict()
+    for factor in factors:
+        for v in factor.variables:
+            neighbors.setdefault(v, set()).update(factor.variables)
+    for v in neighbors:
+        neighbors[v].discard(v)
+
+    heap = [(len(adjacent), v) for v, adjacent in neighbors.items()]
+    heapq.heapify(heap)
+    order = []
+    eliminated = set()
+    while heap:
+        degree, v = heapq.heappop(heap)
+        if v in eliminated or degree != len(neighbors[v]):
+            continue
+        eliminated.add(v)
+        order.append(v)
+
+        # Eliminating v connects all of its neighbors to each other
+        adjacent = neighbors.pop(v)
+        for u in adjacent:
+            neighbors[u].discard(v)
+            neighbors[u].update(adjacent - {u})
+            heapq.heappush(heap, (len(neighbors[u]), u))
+    return order
+
+
+def gene_marginals(people, probs):
+    """
+    Return a dictionary mapping each person to their distribution over gene
+    counts, given every known trait.
+
+    Variables are eliminated one at a time, and each elimination becomes a
+    cluster of a junction tree whose parent is the cluster that later uses
+    its message. Messages are then passed back down the tree, so every
+    person's marginal comes from one pass in each direction. For pedigrees
+    without marriage loops, clusters hold at most a few people and the
+    total work grows linearly with family size.
+    """
+    factors = family_factors(people, probs)
+    order = elimination_order(factors)
+
+    # Factors not yet used, each with the cluster that made it (None for
+    # the family's own factors), indexed by the variables they mention
+    pool = dict()
+    for factor in factors:
+        for u in factor.variables:
+            pool.setdefault(u, dict())[id(factor)] = (factor, None)
+
+    # Pass messages up the tree, eliminating one variable per cluster
+    own = []
+    children = []
+    upward = []
+    for k, v in enumerate(order):
+        involved = list(pool.pop(v).values())
+        for factor, _ in involved:
+            for u in factor.variables:
+                if u != v:
+                    del pool[u][id(factor)]
+        own.append([factor for factor, origin in involved if origin is None])
+        children.append([origin for _, origin in involved if origin is not None])
+
+        message = product(factor for factor, _ in involved)
+        message = message.sum_out(set(message.variables) - {v})
+        upward.append(message)
+        for u in message.variables:
+            pool[u][id(message)] = (message, k)
+
+    # Pass messages back down, from the last cluster eliminated to the first
+    downward = [None] * len(order)
+    marginals = dict()
+    for k in reversed(range(len(order))):
+        incoming = own[k] + [upward[child] for child in children[k]]
+        if downward[k] is not None:
+            incoming.append(downward[k])
+        belief = product(incoming)
+        marginals[order[k]] = belief.sum_out({order[k]})
+
+        for child in children[k]:
+            others = [factor for factor in incoming if factor is not upward[child]]
+            downward[child] = product(others).sum_out(set(upward[child].variables))
+
+    return {
+        person: {genes: marginals[person].table[(genes,)] for genes in GENES}
+        for person in people
+    }
+
+
+def family_probabilities(people, probs):
+    """
+    Return gene and trait distributions for everyone in the family, in
+    the same form as heredity.main builds them, by exact inference.
+    """
+    probabilities = dict()
+    for person, genes in gene_marginals(people, probs).items():
+        trait = people[person]["trait"]
+        if trait is None:
+            has_trait = sum(genes[g] * probs["trait"][g][True] for g in GENES)
+        else:
+            has_trait = 1 if trait else 0
+        probabilities[person] = {
+            "gene": {2: genes[2], 1: genes[1], 0: genes[0]},
+            "trait": {True: has_trait, False: 1 - has_trait},
+        }
+    return probabilities
@@ -1,7 +1,16 @@
+import contextlib
 import csv
 import itertools
+import multiprocessing
 import sys
 
+from elimination import family_probabilities, inheritance
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 PROBS = {
 
     # Unconditional probabilities for having gene
@@ -36,13 +45,83 @@ PROBS = {
     "mutation": 0.01
 }
 
+# Gene assignments whose joint probabilities are computed at once
+BLOCK_SIZE = 1 << 16
+
+# Share of the probability found so far below which pruned enumeration skips a branch
+EPSILON = 1e-9
+
+# Samples drawn at a time by likelihood weighting, and the fewest and most batches drawn
+SAMPLE_BATCH = 10000
+MIN_BATCHES = 30
+MAX_BATCHES = 1000
+
+# Chains run side by side in each batch of Gibbs sampling, the first and
+# longest windows of sweeps discarded while they settle, the potential scale
+# reduction below which they count as settled, and the sweeps kept afterwards
+GIBBS_CHAINS = 1000
+GIBBS_BURN_IN = 50
+GIBBS_MAX_BURN_IN = 800
+GIBBS_SETTLED = 1.1
+GIBBS_SWEEPS = 50
+
+# Standard error of every estimate at which sampling stops
+PRECISION = 0.001
+
+# Number of standard errors either side of an estimate in a 95% confidence interval
+CONFIDENCE_Z = 1.96
+
 
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit(f"Usage: python heredity.py data.csv [{'|'.join(METHODS)}] [processes]")
+    method = sys.argv[2] if len(sys.argv) >= 3 else "elimination"
+    if method not in METHODS:
+        sys.exit(f"Unknown method: {method}")
     people = load_data(sys.argv[1])
+    errors = None
+    if method == "pruned":
+        pruned = []
+        probabilities = enumerate_probabilities(people, EPSILON, pruned)
+    elif method in ["sampling", "gibbs"]:
+        sample = likelihood_weighting if method == "sampling" else gibbs_sampling
+        processes = int(sys.argv[3]) if len(sys.argv) == 4 else None
+        probabilities, errors, samples = sample(people, processes=processes)
+    else:
+        probabilities = METHODS[method](people)
+
+    # Print results
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                if errors is None:
+                    print(f"    {value}: {p:.4f}")
+                else:
+                    error = errors[person][field][value]
+                    print(f"    {value}: {p:.4f} ± {CONFIDENCE_Z * error:.4f}")
+    if errors is not None:
+        print(f"Sampled {samples} times (95% confidence)")
+    if method == "pruned":
+        print(f"Pruned {len(pruned)} branches below {EPSILON} of the probability kept, "
+              f"dropping at most {sum(pruned):.2e} of the probability")
+
+
+def enumerate_probabilities(people, epsilon=0, pruned=None):
+    """
+    Return gene and trait distributions for everyone in `people`, by
+    summing the joint probability of every assignment of genes and traits
+    that agrees with the known traits.
+
+    Unlikely assignments are skipped, as described for `assignments`. If
+    `pruned` is a list, the most each skipped branch could have added to
+    the probability is appended to it, as a share of the total, so the
+    shares add up to a bound on how much was dropped.
+    """
 
     # Keep track of gene and trait probabilities for each person
     probabilities = {
@@ -60,38 +139,437 @@ def main():
         for person in people
     }
 
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
+    # Add up the joint probability of every assignment that agrees with known traits
+    skipped = []
+    kept = 0
+    for one_gene, two_genes, have_trait, p in assignments(people, epsilon, skipped):
+        update(probabilities, one_gene, two_genes, have_trait, p)
+        kept += p
+    if not kept:
+        raise ValueError("Known traits are impossible")
+    if pruned is not None:
+        total = kept + sum(skipped)
+        pruned.extend(p / total for p in skipped)
 
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and
-             people[person]["trait"] != (person in have_trait))
-            for person in names
-        )
-        if fails_evidence:
-            continue
+    # Ensure probabilities sum to 1
+    normalize(probabilities)
+    return probabilities
 
-        # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
 
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
+def prune_probabilities(people):
+    """
+    Return gene and trait distributions for everyone in `people`, by
+    enumeration that skips branches less likely than EPSILON times the
+    probability found so far.
+    """
+    return enumerate_probabilities(people, EPSILON)
 
-    # Ensure probabilities sum to 1
-    normalize(probabilities)
 
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+def eliminate_probabilities(people):
+    """
+    Return gene and trait distributions for everyone in `people`, by
+    variable elimination over the family network.
+    """
+    return family_probabilities(people, PROBS)
+
+
+def vectorized_probabilities(people):
+    """
+    Return gene and trait distributions for everyone in `people`, like
+    enumerate_probabilities, but computing the joint probabilities of a
+    whole block of gene assignments at once with NumPy.
+
+    Assignment k gives person i gene count (k // 3 ** i) % 3. Unknown
+    traits are summed out per person rather than enumerated, since given
+    everyone's genes each trait is independent of the rest.
+    """
+    names = list(people)
+    n = len(names)
+    column = {person: i for i, person in enumerate(names)}
+    gene_probs, inherit, trait_probs = probability_tables()
+    powers = 3 ** np.arange(n)
+
+    total = 0
+    genes_total = np.zeros((n, 3))
+    trait_total = np.zeros(n)
+    for start in range(0, 3 ** n, BLOCK_SIZE):
+        codes = np.arange(start, min(start + BLOCK_SIZE, 3 ** n))
+        genes = codes[:, None] // powers % 3
+
+        p = np.ones(len(codes))
+        for i, person in enumerate(names):
+            mother = people[person]["mother"]
+            father = people[person]["father"]
+            if mother is None and father is None:
+                p *= gene_probs[genes[:, i]]
+            else:
+                p *= inherit[genes[:, i], genes[:, column[mother]], genes[:, column[father]]]
+            trait = people[person]["trait"]
+            if trait is not None:
+                p *= trait_probs[genes[:, i], int(trait)]
+
+        total += p.sum()
+        for i in range(n):
+            genes_total[i] += np.bincount(genes[:, i], weights=p, minlength=3)
+            trait_total[i] += p @ trait_probs[genes[:, i], 1]
+
+    probabilities = dict()
+    for i, person in enumerate(names):
+        trait = people[person]["trait"]
+        has_trait = trait_total[i] / total if trait is None else float(trait)
+        probabilities[person] = {
+            "gene": {g: genes_total[i, g] / total for g in (2, 1, 0)},
+            "trait": {True: has_trait, False: 1 - has_trait},
+        }
+    return probabilities
+
+
+def sample_probabilities(people):
+    """
+    Return gene and trait distributions for everyone in `people`,
+    estimated by likelihood weighting.
+    """
+    return likelihood_weighting(people)[0]
+
+
+def gibbs_probabilities(people):
+    """
+    Return gene and trait distributions for everyone in `people`,
+    estimated by Gibbs sampling.
+    """
+    return gibbs_sampling(people)[0]
+
+
+def likelihood_weighting(people, precision=PRECISION, processes=None, seed=None):
+    """
+    Estimate gene and trait distributions for everyone in `people` by
+    likelihood weighting, as described for `sample_batches`. Return the
+    distributions, their standard errors and the number of samples drawn.
+    """
+    probabilities, errors, batches = sample_batches(
+        weight_batch, people, precision, processes, seed
+    )
+    return probabilities, errors, batches * SAMPLE_BATCH
+
+
+def gibbs_sampling(people, precision=PRECISION, processes=None, seed=None):
+    """
+    Estimate gene and trait distributions for everyone in `people` by
+    Gibbs sampling, as described for `sample_batches`. Return the
+    distributions, their standard errors and the number of samples kept.
+
+    Each batch's chains must settle before their samples are kept, which
+    on large, inbred families can take far longer than likelihood weighting
+    takes to reach the same precision; compare both against elimination
+    before relying on either.
+    """
+    probabilities, errors, batches = sample_batches(
+        gibbs_batch, people, precision, processes, seed
+    )
+    return probabilities, errors, batches * GIBBS_CHAINS * GIBBS_SWEEPS
+
+
+def sample_batches(batch, people, precision=PRECISION, processes=None, seed=None):
+    """
+    Estimate gene and trait distributions for everyone in `people` from
+    independent batches of samples, where batch(people, seed) returns one
+    batch's weighted totals, as described for `weight_batch`. Batches are
+    drawn until the standard error of every estimate is at most `precision`
+    and every batch has settled (or MAX_BATCHES batches have been drawn),
+    spread over a pool of `processes` worker processes if given. Standard
+    errors only measure the spread between batches, so they cannot be
+    trusted to stop sampling while any batch is still biased by where its
+    chains started.
+
+    Return the distributions, their standard errors in the same form, and
+    the number of batches drawn.
+    """
+    names = list(people)
+    seeds = np.random.SeedSequence(seed)
+    round_size = processes or 1
+
+    batches = []
+    with multiprocessing.Pool(processes) if processes else contextlib.nullcontext() as pool:
+        while len(batches) < MAX_BATCHES:
+            tasks = [(people, child) for child in seeds.spawn(round_size)]
+            if pool is None:
+                batches.extend(batch(*task) for task in tasks)
+            else:
+                batches.extend(pool.starmap(batch, tasks))
+            if len(batches) >= MIN_BATCHES:
+                mean, error = pool_batches(batches)
+                if np.all(error <= precision) and all(settled for *_, settled in batches):
+                    break
+    mean, error = pool_batches(batches)
+
+    def distributions(values, no_trait):
+        return {
+            person: {
+                "gene": {g: values[i, g] for g in (2, 1, 0)},
+                "trait": {True: values[i, 3], False: no_trait[i]},
+            }
+            for i, person in enumerate(names)
+        }
+
+    # Known traits come straight from the evidence, and rounding must not
+    # push an estimated chance of the trait outside [0, 1]
+    has_trait = np.clip(mean[:, 3], 0, 1)
+    for i, person in enumerate(names):
+        if people[person]["trait"] is not None:
+            has_trait[i] = float(people[person]["trait"])
+            error[i, 3] = 0
+    mean[:, 3] = has_trait
+
+    probabilities = distributions(mean, 1 - has_trait)
+    errors = distributions(error, error[:, 3])
+    return probabilities, errors, len(batches)
+
+
+def pool_batches(batches):
+    """
+    Given (totals, weight, scale, settled) tuples from a batch function,
+    return an N x 4 array of estimates from all batches together and their
+    standard errors.
+
+    Every batch's totals and weight are in units of exp(scale), so they
+    are first brought to a common scale. The estimates are then the summed
+    totals over the summed weight, rather than an average of each batch's
+    own ratio, which would keep each batch's bias however many were drawn.
+    Their standard errors come from the spread of each batch's totals about
+    what the pooled estimates predict for its weight (the delta method).
+    """
+    totals = np.array([batch[0] for batch in batches])
+    weights = np.array([batch[1] for batch in batches], dtype=float)
+    scales = np.array([batch[2] for batch in batches], dtype=float)
+    factors = np.exp(scales - scales.max())
+    totals *= factors[:, None, None]
+    weights *= factors
+
+    estimates = totals.sum(axis=0) / weights.sum()
+    residuals = totals - estimates * weights[:, None, None]
+    count = len(batches)
+    variance = (residuals ** 2).sum(axis=0) / (count * max(count - 1, 1) * weights.mean() ** 2)
+    return estimates, np.sqrt(variance)
+
+
+def weight_batch(people, seed):
+    """
+    Draw SAMPLE_BATCH samples of everyone's genes, drawing each person with
+    a known trait given that trait as well as their parents' genes, and
+    weight each sample by the probability of the known traits given the
+    parents' genes, as described for `forward_sample`.
+
+    Return a (totals, weight, scale, settled) tuple: an N x 4 array
+    holding, for each person in `people`, the total weight of samples in
+    which they have 0, 1 and 2 copies of the gene and the weighted chance
+    of them having the trait, the total weight of all samples, the
+    logarithm of the unit both totals are measured in, and whether the
+    samples can be trusted, which independent samples always can.
+    """
+    rng = np.random.default_rng(seed)
+    _, _, trait_probs = probability_tables()
+    log_weights = np.zeros(SAMPLE_BATCH)
+    genes = forward_sample(people, SAMPLE_BATCH, rng, log_weights)
+
+    # Weights are kept as logarithms so large families do not underflow,
+    # and measured relative to the batch's largest so they can be pooled
+    scale = log_weights.max()
+    weights = np.exp(log_weights - scale)
+    weight = weights.sum()
+
+    totals = np.zeros((len(people), 4))
+    for i, person in enumerate(people):
+        totals[i, :3] = np.bincount(genes[:, i], weights=weights, minlength=3)
+        trait = people[person]["trait"]
+        if trait is None:
+            # Average the chance of the trait rather than sampling it
+            totals[i, 3] = weights @ trait_probs[genes[:, i], 1]
+        else:
+            totals[i, 3] = float(trait) * weight
+    return totals, weight, scale, True
+
+
+def gibbs_batch(people, seed):
+    """
+    Run GIBBS_CHAINS Gibbs sampling chains side by side, each starting from
+    one of SAMPLE_BATCH likelihood-weighted samples, drawn in proportion to
+    its weight. Every sweep redraws each person's genes given their
+    parents', their children's, their children's other parents' and their
+    own trait.
+
+    The chains are burned in over windows of GIBBS_BURN_IN sweeps, then
+    twice, four times as many and so on up to GIBBS_MAX_BURN_IN, until the
+    potential scale reduction of every gene count over the last window is
+    at most GIBBS_SETTLED. Return the chains' totals over the next
+    GIBBS_SWEEPS sweeps, in the same form as `weight_batch`, with every
+    sample given a weight of 1, and whether the chains settled.
+    """
+    rng = np.random.default_rng(seed)
+    gene_probs, inherit, trait_probs = probability_tables()
+    column = {person: i for i, person in enumerate(people)}
+
+    # Row i holds person i's gene count in every chain, starting from
+    # samples that already agree with the known traits, since chains started
+    # from the inheritance model alone can take hundreds of sweeps to reach
+    # them in large, inbred families
+    log_weights = np.zeros(SAMPLE_BATCH)
+    samples = forward_sample(people, SAMPLE_BATCH, rng, log_weights)
+    weights = np.exp(log_weights - log_weights.max())
+    starts = rng.choice(SAMPLE_BATCH, GIBBS_CHAINS, p=weights / weights.sum())
+    genes = np.ascontiguousarray(samples[starts].T)
+
+    # Inheritance tables flattened so one lookup gives all three gene counts:
+    # by parents, row 3 * mother + father gives the child's distribution, and
+    # by child, row 3 * child + other parent gives a weight for each of this
+    # parent's gene counts
+    by_parents = inherit.reshape(3, 9).T.copy()
+    by_child = {
+        "mother": inherit.transpose(0, 2, 1).reshape(9, 3),
+        "father": inherit.reshape(9, 3),
+    }
+
+    # Each person's parents' rows, and their children with the other parent
+    parents = dict()
+    children = {i: [] for i in range(len(people))}
+    for person, data in people.items():
+        if data["mother"] is not None:
+            mother = column[data["mother"]]
+            father = column[data["father"]]
+            parents[column[person]] = (mother, father)
+            children[mother].append((column[person], father, by_child["mother"]))
+            children[father].append((column[person], mother, by_child["father"]))
+    evidence = {
+        column[person]: trait_probs[:, int(data["trait"])]
+        for person, data in people.items() if data["trait"] is not None
+    }
+
+    def sweep():
+        for i in range(len(people)):
+            if i in parents:
+                mother, father = parents[i]
+                p = by_parents[3 * genes[mother] + genes[father]]
+            else:
+                p = np.tile(gene_probs, (GIBBS_CHAINS, 1))
+            if i in evidence:
+                p *= evidence[i]
+            for child, other, table in children[i]:
+                p *= table[3 * genes[child] + genes[other]]
+
+            below_one = p[:, 0]
+            below_two = below_one + p[:, 1]
+            u = rng.random(GIBBS_CHAINS) * (below_two + p[:, 2])
+            genes[i] = (u > below_one).astype(np.int64) + (u > below_two)
+
+    window = GIBBS_BURN_IN
+    while True:
+        ones = np.zeros(genes.shape)
+        twos = np.zeros(genes.shape)
+        for _ in range(window):
+            sweep()
+            ones += genes == 1
+            twos += genes == 2
+        settled = max(
+            scale_reduction(ones, window), scale_reduction(twos, window)
+        ) <= GIBBS_SETTLED
+        if settled or window >= GIBBS_MAX_BURN_IN:
+            break
+        window *= 2
+
+    totals = np.zeros((len(people), 4))
+    for _ in range(GIBBS_SWEEPS):
+        sweep()
+        for i in range(len(people)):
+            totals[i, :3] += np.bincount(genes[i], minlength=3)
+            totals[i, 3] += trait_probs[genes[i], 1].sum()
+
+    weight = GIBBS_CHAINS * GIBBS_SWEEPS
+    for i, person in enumerate(people):
+        if people[person]["trait"] is not None:
+            totals[i, 3] = float(people[person]["trait"]) * weight
+    return totals, weight, 0, settled
+
+
+def scale_reduction(counts, sweeps):
+    """
+    Given an N x chains array of how many of the last `sweeps` sweeps each
+    chain spent in some state, return the largest potential scale reduction
+    (R-hat) over the N rows: the square root of how much more the chains'
+    states vary overall than within each chain. It nears 1 once the chains
+    have forgotten where they started, and stays well above 1 while some
+    are stuck in states the others rarely visit.
+    """
+    means = counts / sweeps
+    within = (means * (1 - means)).mean(axis=1) * sweeps / (sweeps - 1)
+    between = means.var(axis=1, ddof=1)
+    overall = within * (sweeps - 1) / sweeps + between
+
+    # A state no chain ever leaves or enters shows nothing, but chains
+    # frozen in different states never settle
+    ratio = np.where(between > 0, np.inf, 1.0)
+    np.divide(overall, within, out=ratio, where=within > 0)
+    return np.sqrt(ratio.max(initial=1))
+
+
+def forward_sample(people, size, rng, log_weights=None):
+    """
+    Return a `size` x N array of gene counts for everyone in `people`,
+    drawn from the inheritance model with parents drawn before children.
+
+    If `log_weights` is an array of length `size`, people with known
+    traits are instead drawn given their trait as well, and the logarithm
+    of the probability of that trait given their parents' genes is added
+    to each sample's entry. Weighting samples by exp(log_weights) then
+    makes up for the change, and no sample is wasted on genes the known
+    traits make unlikely.
+    """
+    gene_probs, inherit, trait_probs = probability_tables()
+
+    column = {person: i for i, person in enumerate(people)}
+    genes = np.zeros((size, len(people)), dtype=np.int64)
+    for person in birth_order(people):
+        i = column[person]
+        mother = people[person]["mother"]
+        father = people[person]["father"]
+        trait = people[person]["trait"]
+
+        # Probability of each gene count, indexed by [child, mother, father]
+        # gene counts for people with parents
+        p = gene_probs if mother is None and father is None else inherit
+        weighted = log_weights is not None and trait is not None
+        if weighted:
+            p = p * trait_probs[:, int(trait)].reshape((3,) + (1,) * (p.ndim - 1))
+        total = p.sum(axis=0)
+        cumulative = (p / total).cumsum(axis=0)
+
+        u = rng.random(size)
+        if mother is None and father is None:
+            cumulative = cumulative[:, None]
+        else:
+            parents = (genes[:, column[mother]], genes[:, column[father]])
+            cumulative = cumulative[(slice(None),) + parents]
+            total = total[parents]
+        if weighted:
+            log_weights += np.log(total)
+        genes[:, i] = (u > cumulative[0]).astype(np.int64) + (u > cumulative[1])
+    return genes
+
+
+def probability_tables():
+    """
+    Return the PROBS tables as arrays: the probability of each gene count
+    for a person without parents, the probability of each gene count
+    indexed by [child, mother, father] gene counts, and the probability
+    of each trait indexed by [gene count, trait].
+    """
+    gene_probs = np.array([PROBS["gene"][g] for g in range(3)])
+    trait_probs = np.array([
+        [PROBS["trait"][g][False], PROBS["trait"][g][True]] for g in range(3)
+    ])
+    inherit = np.zeros((3, 3, 3))
+    for mother, father in itertools.product(range(3), repeat=2):
+        for child, p in inheritance(mother, father, PROBS["mutation"]).items():
+            inherit[child, mother, father] = p
+    return gene_probs, inherit, trait_probs
 
 
 def load_data(filename):
@@ -116,6 +594,82 @@ def load_data(filename):
     return data
 
 
+def assignments(people, epsilon=0, pruned=None):
+    """
+    Lazily yield (one_gene, two_genes, have_trait, p) for every assignment
+    of genes and traits that agrees with the known traits, where `p` is its
+    joint probability.
+
+    People are assigned one at a time, parents before children, multiplying
+    in each person's probability as they are assigned. People with known
+    traits only ever take that trait. Any branch whose probability so far
+    falls below `epsilon` times the probability of the assignments yielded
+    so far is skipped along with every assignment under it, and if `pruned`
+    is a list, that probability is appended to it: an upper bound on the
+    probability the branch would have added. Nothing is skipped before the
+    first assignment is yielded, so at least one always is.
+    """
+    order = birth_order(people)
+    genes = dict()
+    traits = dict()
+    kept = 0
+
+    def assign(k, p):
+        nonlocal kept
+        if k == len(order):
+            kept += p
+            yield (
+                {person for person in order if genes[person] == 1},
+                {person for person in order if genes[person] == 2},
+                {person for person in order if traits[person]},
+                p
+            )
+            return
+
+        person = order[k]
+        mother = people[person]["mother"]
+        father = people[person]["father"]
+        known = people[person]["trait"]
+        if mother is None and father is None:
+            p_genes = PROBS["gene"]
+        else:
+            p_genes = inheritance(genes[mother], genes[father], PROBS["mutation"])
+        for gene in (0, 1, 2):
+            p_gene = p_genes[gene]
+            for trait in ((True, False) if known is None else (known,)):
+                branch = p * p_gene * PROBS["trait"][gene][trait]
+                if branch < epsilon * kept:
+                    if pruned is not None:
+                        pruned.append(branch)
+                    continue
+                genes[person] = gene
+                traits[person] = trait
+                yield from assign(k + 1, branch)
+
+    return assign(0, 1)
+
+
+def birth_order(people):
+    """
+    Return a list of everyone in `people`, with parents before their children.
+    """
+    order = []
+    placed = set()
+
+    def place(person):
+        if person in placed:
+            return
+        placed.add(person)
+        for parent in (people[person]["mother"], people[person]["father"]):
+            if parent is not None:
+                place(parent)
+        order.append(person)
+
+    for person in people:
+        place(person)
+    return order
+
+
 def powerset(s):
     """
     Return a list of all possible subsets of set s.
@@ -141,61 +695,27 @@ def joint_probability(people, one_gene, two_genes, have_trait):
     """
     P_total = 1
 
+    def genes(person):
+        if person in one_gene:
+            return 1
+        elif person in two_genes:
+            return 2
+        return 0
+
     for person in people:
+        gene_index = genes(person)
+        trait_index = person in have_trait
+
         #if person has no parents
         if (people[person]["mother"]== None) and (people[person]["father"]== None):
-            if person in one_gene:
-                gene_index = 1
-            elif person in two_genes:
-                gene_index = 2
-            else:
-                gene_index = 0
-
-            if person in have_trait:
-                trait_index = True
-            else:
-                trait_index = False
-            
-            P_total *= PROBS["gene"][gene_index]*PROBS["trait"][gene_index][trait_index]
-
+            P_gene = PROBS["gene"][gene_index]
         else:
             #if person has parents
-            P_parents = 0
-            parents = [people[person]["mother"], people[person]["father"]]
-            parents_value = [[0,0],[0,0]] #row 0 = mom, row 1 - dad, col 0 = has it, col 1 = does not have it 0,0 P mom has, 0,1 mom has not, 1,0 dad has, 1,1 dad has not
-
-            for x in range (0,2):
-                if parents[x] in two_genes:
-                    parents_value[x][0] = 1-PROBS["mutation"]
-                    parents_value[x][1] = PROBS["mutation"]
-                elif parents[x] in one_gene:
-                    parents_value[x][0] = 0.5
-                    parents_value[x][1] = 0.5
-                else:
-                    parents_value[x][0] = PROBS["mutation"]
-                    parents_value[x][1] = 1-PROBS["mutation"]
+            mother = genes(people[person]["mother"])
+            father = genes(people[person]["father"])
+            P_gene = inheritance(mother, father, PROBS["mutation"])[gene_index]
 
-            if person in one_gene:
-                P_parents = parents_value[0][0]*parents_value[1][1] + parents_value[1][0]*parents_value[0][1]
-            elif person in two_genes:
-                P_parents = parents_value[0][0]*parents_value[1][0]
-            else:
-                P_parents = parents_value[0][1]*parents_value[1][1]
-
-
-            if person in one_gene:
-                gene_index = 1
-            elif person in two_genes:
-                gene_index = 2
-            else:
-                gene_index = 0 
-                    
-            if person in have_trait:
-                trait_index = True
-            else:
-                trait_index = False        
-             
-            P_total *= P_parents * PROBS["trait"][gene_index][trait_index]
+        P_total *= P_gene * PROBS["trait"][gene_index][trait_index]
 
     return P_total
 
@@ -245,5 +765,17 @@ def normalize(probabilities):
                 probabilities[person][p_type][index] /= sum_prob  
 
 
+# Ways of computing everyone's gene and trait distributions, by name
+METHODS = {
+    "enumeration": enumerate_probabilities,
+    "pruned": prune_probabilities,
+    "elimination": eliminate_probabilities,
+}
+if np is not None:
+    METHODS["vectorized"] = vectorized_probabilities
+    METHODS["sampling"] = sample_probabilities
+    METHODS["gibbs"] = gibbs_probabilities
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,165 @@
+import collections
+import os
+import pickle
+
+from heredity import METHODS
+
+# Most family structures kept in a StructureCache
+CACHE_SIZE = 4096
+
+
+def signature(people):
+    """
+    Return a canonical ordering of the names in `people` and the family's
+    structural signature: a tuple with, for each person in that order, the
+    positions of their mother and father (None for people without parents)
+    and their known trait.
+
+    People are ordered by their place in the family rather than by name,
+    so families that differ only in names or row order almost always share
+    a signature. Equal signatures always mean the same family shape, so a
+    signature is safe to use as a cache key.
+    """
+    names = list(people)
+    position = {person: i for i, person in enumerate(names)}
+    parents = [
+        (position.get(people[person]["mother"]), position.get(people[person]["father"]))
+        for person in names
+    ]
+    children = [[] for _ in names]
+    for i, (mother, father) in enumerate(parents):
+        if mother is not None:
+            children[mother].append((i, "mother", father))
+            children[father].append((i, "father", mother))
+
+    # Colour each person by their trait and whether they have parents, then
+    # repeatedly refine colours by the colours of their parents, children and
+    # partners until no more people can be told apart
+    colors = rank([
+        (people[person]["trait"], parents[i][0] is None)
+        for i, person in enumerate(names)
+    ])
+    while True:
+        refined = rank([
+            (
+                colors[i],
+                None if mother is None else (colors[mother], colors[father]),
+                sorted((colors[child], role, colors[other]) for child, role, other in children[i]),
+            )
+            for i, (mother, father) in enumerate(parents)
+        ])
+        if len(set(refined)) == len(set(colors)):
+            break
+        colors = refined
+
+    # People the refinement cannot tell apart keep their order in `people`
+    order = sorted(range(len(names)), key=lambda i: (colors[i], i))
+    canonical = {i: k for k, i in enumerate(order)}
+    structure = tuple(
+        (
+            None if parents[i][0] is None else canonical[parents[i][0]],
+            None if parents[i][1] is None else canonical[parents[i][1]],
+            people[names[i]]["trait"],
+        )
+        for i in order
+    )
+    return [names[i] for i in order], structure
+
+
+def rank(values):
+    """
+    Replace each value in a list by its position among the distinct values.
+    Values are ordered by their repr, since they may mix None and booleans.
+    """
+    ranks = {value: k for k, value in enumerate(sorted(set(map(repr, values))))}
+    return [ranks[repr(value)] for value in values]
+
+
+def solve_structure(structure, method="elimination"):
+    """
+    Return, for each person in a family structure in turn, their gene and
+    trait distributions computed by one of heredity's METHODS.
+    """
+    people = {
+        str(i): {
+            "name": str(i),
+            "mother": None if mother is None else str(mother),
+            "father": None if father is None else str(father),
+            "trait": trait,
+        }
+        for i, (mother, father, trait) in enumerate(structure)
+    }
+    probabilities = METHODS[method](people)
+    return [probabilities[str(i)] for i in range(len(structure))]
+
+
+class StructureCache():
+    """
+    Least recently used cache of gene and trait distributions, keyed by
+    inference method and family signature, that can be saved to disk.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.isfile(path):
+            with open(path, "rb") as f:
+                self.entries.update(pickle.load(f))
+            self.trim()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """
+        Return the cached distributions for a (method, structure) key, or
+        None if there are none, marking them as recently used.
+        """
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, distributions):
+        """
+        Cache the distributions for a (method, structure) key, forgetting
+        the least recently used entries if the cache is full.
+        """
+        self.entries[key] = distributions
+        self.entries.move_to_end(key)
+        self.trim()
+
+    def trim(self):
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def probabilities(self, people, method="elimination"):
+        """
+        Return gene and trait distributions for everyone in `people`, as
+        heredity's METHODS do, solving the family only if no family of the
+        same shape is cached.
+        """
+        names, structure = signature(people)
+        key = (method, structure)
+        distributions = self.get(key)
+        if distributions is None:
+            distributions = solve_structure(structure, method)
+            self.put(key, distributions)
+        return dict(zip(names, distributions))
+
+    def save(self):
+        """
+        Write the cache to its path, if it has one.
+        """
+        if self.path is None:
+            return
+        with open(self.path, "wb") as f:
+            pickle.dump(self.entries, f)
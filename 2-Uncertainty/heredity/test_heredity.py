@@ -0,0 +1,119 @@
+import unittest
+
+import heredity
+
+
+def family(rows):
+    """
+    Return a people dictionary, as load_data builds, from (name, mother,
+    father, trait) rows.
+    """
+    return {
+        name: {"name": name, "mother": mother, "father": father, "trait": trait}
+        for name, mother, father, trait in rows
+    }
+
+
+# Five founders with the trait make carriers far likelier than the gene's
+# prior suggests, so every sample's weight matters
+STRONG_EVIDENCE = family([
+    ("f1", None, None, True),
+    ("f2", None, None, True),
+    ("f3", None, None, True),
+    ("f4", None, None, True),
+    ("f5", None, None, True),
+    ("p1", "f1", "f2", None),
+    ("p2", "f3", "p1", False),
+    ("p3", "p2", "f5", None),
+])
+
+# First cousins, both grandchildren of affected grandparents, have an
+# affected child, so the family has a loop and genes stick together along it
+COUSIN_MARRIAGE = family([
+    ("g1", None, None, True),
+    ("g2", None, None, True),
+    ("s1", None, None, False),
+    ("s2", None, None, None),
+    ("a1", "g1", "g2", True),
+    ("a2", "g1", "g2", None),
+    ("c1", "a1", "s1", None),
+    ("c2", "s2", "a2", True),
+    ("x", "c1", "c2", True),
+    ("y", "c1", "c2", True),
+])
+
+# Ten generations of a line where each child's parents come from the last
+# four people born; chains started from the inheritance model alone stay
+# stuck far from the known traits for hundreds of sweeps
+INBRED_LINE = family([
+    ("p0", None, None, None),
+    ("p1", None, None, None),
+    ("p2", None, None, True),
+    ("p3", None, None, False),
+    ("p4", "p3", "p1", True),
+    ("p5", "p4", "p2", True),
+    ("p6", "p3", "p5", True),
+    ("p7", "p3", "p5", True),
+    ("p8", "p5", "p7", None),
+    ("p9", "p5", "p7", True),
+    ("p10", "p9", "p8", None),
+    ("p11", "p9", "p8", True),
+    ("p12", "p9", "p10", False),
+    ("p13", "p12", "p11", True),
+    ("p14", "p10", "p12", None),
+    ("p15", "p11", "p13", False),
+    ("p16", "p12", "p14", False),
+    ("p17", "p15", "p13", True),
+    ("p18", "p14", "p17", True),
+    ("p19", "p16", "p15", False),
+])
+
+
+class SamplingTest():
+    """
+    Checks shared by every sampler, which `sample` names.
+    """
+
+    def assertAgreesWithElimination(self, people):
+        exact = heredity.eliminate_probabilities(people)
+        estimates, errors, _ = getattr(heredity, self.sample)(
+            people, precision=0.002, seed=0
+        )
+        for person in people:
+            for field in ["gene", "trait"]:
+                for value, p in exact[person][field].items():
+                    error = errors[person][field][value]
+                    self.assertLessEqual(error, 0.002)
+                    self.assertAlmostEqual(
+                        estimates[person][field][value], p, delta=5 * error + 1e-9,
+                        msg=f"{person} {field} {value}"
+                    )
+
+    def test_agrees_with_elimination_on_strong_evidence(self):
+        self.assertAgreesWithElimination(STRONG_EVIDENCE)
+
+    def test_agrees_with_elimination_on_cousin_marriage(self):
+        self.assertAgreesWithElimination(COUSIN_MARRIAGE)
+
+
+@unittest.skipIf(heredity.np is None, "sampling requires numpy")
+class LikelihoodWeightingTest(SamplingTest, unittest.TestCase):
+    sample = "likelihood_weighting"
+
+    def test_empty_family(self):
+        estimates, errors, samples = heredity.likelihood_weighting({}, seed=0)
+        self.assertEqual(estimates, {})
+        self.assertEqual(errors, {})
+        self.assertGreater(samples, 0)
+
+
+@unittest.skipIf(heredity.np is None, "sampling requires numpy")
+class GibbsSamplingTest(SamplingTest, unittest.TestCase):
+    sample = "gibbs_sampling"
+
+    def test_agrees_with_elimination_on_inbred_line(self):
+        self.assertAgreesWithElimination(INBRED_LINE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import argparse
+import time
+
+import numpy as np
+
+from crawler import crawl_graph
+from graph import graph_from_edges, is_saved_graph, load_graph
+from pagerank import (
+    DAMPING, METHODS, TOLERANCE, power_iteration, solve_pagerank, update_pagerank
+)
+
+# Tolerance of the reference solution every method is compared against
+REFERENCE_TOLERANCE = 1e-12
+
+# Links per page in generated graphs
+LINKS_PER_PAGE = 8
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the convergence of PageRank iteration methods."
+    )
+    parser.add_argument(
+        "graphs", nargs="*", default=["corpus0", "corpus1", "corpus2"],
+        help="corpus directories, saved graphs, or a number of pages to generate"
+    )
+    parser.add_argument("-t", "--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument(
+        "-m", "--method", action="append", choices=list(METHODS),
+        help="method to run (default: all)"
+    )
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument(
+        "--history", action="store_true",
+        help="print each method's residual at every iteration"
+    )
+    parser.add_argument(
+        "--update", type=int, metavar="LINKS",
+        help="also add this many random links and compare update_pagerank "
+             "with iterating again"
+    )
+    args = parser.parse_args()
+
+    for name in args.graphs:
+        graph = load(name, args.seed)
+        reference = power_iteration(graph, DAMPING, REFERENCE_TOLERANCE)
+        print(f"{name} ({len(graph)} pages, {len(graph.targets)} links)")
+        for method in args.method or METHODS:
+            start = time.perf_counter()
+            ranks, history = solve_pagerank(graph, DAMPING, method, args.tolerance)
+            elapsed = time.perf_counter() - start
+            error = np.abs(ranks - reference).sum()
+            print(f"  {method:<14} {len(history):>4} iterations  "
+                  f"{elapsed * 1000:9.2f}ms  L1 error {error:.2e}")
+            if args.history:
+                for i, (residual, seconds) in enumerate(history, 1):
+                    print(f"    {i:>4}  {seconds * 1000:9.2f}ms  residual {residual:.2e}")
+        if args.update:
+            compare_update(graph, reference, args.update, args.tolerance, args.seed)
+
+
+def compare_update(graph, ranks, links, tolerance, seed=0):
+    """
+    Add `links` random links to a graph whose PageRank vector is `ranks`,
+    and print how long recomputing its ranks takes and how far from the
+    new graph's reference the result is, by iterating from scratch, by
+    iterating from the old ranks and by update_pagerank at `tolerance`
+    and at a tenth and a hundredth of it.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(graph)
+    edited = graph_from_edges(
+        graph.pages,
+        np.concatenate([graph.sources, rng.integers(n, size=links)]),
+        np.concatenate([graph.targets, rng.integers(n, size=links)]),
+    )
+    reference = power_iteration(edited, DAMPING, REFERENCE_TOLERANCE)
+    print(f"  after adding {links} links")
+    runs = [
+        ("power", tolerance, lambda t: power_iteration(edited, DAMPING, t)),
+        ("power (warm)", tolerance, lambda t: power_iteration(edited, DAMPING, t, ranks.copy())),
+    ] + [
+        ("update", t, lambda t: update_pagerank(edited, DAMPING, graph.pages, ranks, t))
+        for t in (tolerance, tolerance / 10, tolerance / 100)
+    ]
+    for name, t, run in runs:
+        start = time.perf_counter()
+        result = run(t)
+        elapsed = time.perf_counter() - start
+        error = np.abs(result - reference).sum()
+        print(f"  {name:<14} tolerance {t:.0e}  "
+              f"{elapsed * 1000:9.2f}ms  L1 error {error:.2e}")
+
+
+def load(name, seed=0):
+    """
+    Return the LinkGraph for a corpus directory or saved graph, or a random
+    graph with that many pages if `name` is a number.
+    """
+    if name.isdigit():
+        return random_graph(int(name), seed)
+    if is_saved_graph(name):
+        return load_graph(name)
+    return crawl_graph(name)
+
+
+def random_graph(n, seed=0):
+    """
+    Generate a graph of `n` pages, each with up to LINKS_PER_PAGE links whose
+    targets follow a power law, so a few pages gather most of the links.
+    """
+    rng = np.random.default_rng(seed)
+    sources = np.repeat(np.arange(n), LINKS_PER_PAGE)
+    popularity = rng.permutation(n)
+    targets = popularity[(rng.zipf(1.5, size=len(sources)) - 1) % n]
+    return graph_from_edges([f"{i}.html" for i in range(n)], sources, targets)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import os
+import re
+import sys
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from graph import graph_from_edges, is_saved_graph, save_graph
+
+# Bytes read from a file and searched for links at a time
+CHUNK_SIZE = 1 << 16
+
+# Most bytes of an unfinished tag carried over from one chunk to the next
+OVERLAP = 4096
+
+# Link in an <a> tag, the same pattern pagerank.crawl has always used
+LINK = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Files read by each task handed to the thread pool
+FILES_PER_TASK = 250
+
+# Files crawled between progress reports
+REPORT_EVERY = 1000
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python crawler.py corpus [graph]")
+    if len(sys.argv) == 3:
+        graph, parsed = update_graph(sys.argv[1], sys.argv[2], report=print_progress)
+        print(f"Parsed {parsed} new or changed pages, saved to {sys.argv[2]}")
+    else:
+        graph = crawl_graph(sys.argv[1], report=print_progress)
+    print(f"{len(graph)} pages, {len(graph.targets)} links")
+
+
+def crawl_graph(directory, workers=None, report=None):
+    """
+    Parse a directory of HTML pages concurrently and return a LinkGraph of
+    the links between them.
+
+    Pages are numbered up front, so each file's links are turned straight
+    into page numbers as it is parsed. If `report` is given, it is called
+    as report(done, total, bytes_read, seconds) every REPORT_EVERY files
+    and once at the end.
+    """
+    pages = sorted(
+        entry.name for entry in os.scandir(directory)
+        if entry.name.endswith(".html") and entry.is_file()
+    )
+    index = {page: i for i, page in enumerate(pages)}
+
+    sources = array("q")
+    targets = array("q")
+    for i, links in crawl_files(
+        directory, pages, lambda path: parse_links(path, index), workers, report
+    ):
+        sources.extend([i] * len(links))
+        targets.extend(links)
+
+    return graph_from_edges(pages, sources, targets)
+
+
+def update_graph(directory, path, workers=None, report=None):
+    """
+    Bring the graph saved at `path` up to date with a directory of HTML
+    pages, parsing only files that are new or whose modification time has
+    changed, and save it again. If nothing is saved at `path` yet, every
+    file is parsed.
+
+    Alongside the graph, the save keeps every link of every page, including
+    links to names that are not pages yet, so a page added later still
+    gains the links pointing at it from files that were not re-parsed.
+
+    Return the updated LinkGraph and the number of files parsed.
+    """
+    mtimes = {
+        entry.name: entry.stat().st_mtime_ns for entry in os.scandir(directory)
+        if entry.name.endswith(".html") and entry.is_file()
+    }
+    pages = sorted(mtimes)
+    n = len(pages)
+
+    # Link targets are numbered into `names`: first the pages, then any
+    # other names linked to
+    names = list(pages)
+    index = {page: i for i, page in enumerate(pages)}
+
+    def intern(name):
+        if name not in index:
+            index[name] = len(names)
+            names.append(name)
+        return index[name]
+
+    # Reuse saved links for every file that has not changed
+    links = [None] * n
+    if is_saved_graph(path) and os.path.isfile(os.path.join(path, "mtimes.npy")):
+        with open(os.path.join(path, "pages.txt")) as f:
+            saved_pages = f.read().splitlines()
+        with open(os.path.join(path, "links.txt")) as f:
+            saved_names = saved_pages + f.read().splitlines()
+        saved_mtimes = np.load(os.path.join(path, "mtimes.npy"))
+        saved_offsets = np.load(os.path.join(path, "link_offsets.npy"))
+        saved_targets = np.load(os.path.join(path, "link_targets.npy"))
+
+        renumber = np.array([intern(name) for name in saved_names], dtype=np.int64)
+        for j, page in enumerate(saved_pages):
+            i = index[page]
+            if i < n and saved_mtimes[j] == mtimes[page]:
+                links[i] = renumber[saved_targets[saved_offsets[j]:saved_offsets[j + 1]]]
+
+    stale = [i for i in range(n) if links[i] is None]
+    for k, found in crawl_files(
+        directory, [pages[i] for i in stale], read_links, workers, report
+    ):
+        links[stale[k]] = np.array([intern(name) for name in found], dtype=np.int64)
+
+    link_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(targets) for targets in links], out=link_offsets[1:])
+    link_targets = np.concatenate(links) if links else np.zeros(0, dtype=np.int64)
+
+    # Forget names that no page links to any more
+    used = np.zeros(len(names), dtype=bool)
+    used[:n] = True
+    used[link_targets] = True
+    link_targets = (np.cumsum(used) - 1)[link_targets]
+    other_names = [name for name, keep in zip(names[n:], used[n:]) if keep]
+
+    # The graph itself only keeps links between pages
+    sources = np.repeat(np.arange(n), np.diff(link_offsets))
+    internal = link_targets < n
+    graph = graph_from_edges(pages, sources[internal], link_targets[internal])
+
+    save_graph(graph, path)
+    with open(os.path.join(path, "links.txt"), "w") as f:
+        f.writelines(name + "\n" for name in other_names)
+    np.save(os.path.join(path, "mtimes.npy"), np.array([mtimes[page] for page in pages]))
+    np.save(os.path.join(path, "link_offsets.npy"), link_offsets)
+    np.save(os.path.join(path, "link_targets.npy"), link_targets)
+
+    return graph, len(stale)
+
+
+def crawl_files(directory, filenames, read, workers=None, report=None):
+    """
+    Call `read` on the path of each file in `filenames` from a thread pool,
+    where `read` returns a (result, bytes read) pair. Yield (k, result)
+    pairs, where k is the file's position in `filenames`, as files finish.
+
+    Files are handed to the pool FILES_PER_TASK at a time, since scheduling
+    a task costs about as much as searching a small file for links.
+    """
+    def read_group(first):
+        return [
+            read(os.path.join(directory, filename))
+            for filename in filenames[first:first + FILES_PER_TASK]
+        ]
+
+    done = 0
+    bytes_read = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        futures = {
+            executor.submit(read_group, first): first
+            for first in range(0, len(filenames), FILES_PER_TASK)
+        }
+        for future in as_completed(futures):
+            for k, (result, size) in enumerate(future.result(), futures[future]):
+                done += 1
+                bytes_read += size
+                yield k, result
+                if report is not None and (done % REPORT_EVERY == 0 or done == len(filenames)):
+                    report(done, len(filenames), bytes_read, time.perf_counter() - start)
+
+
+def read_links(path):
+    """
+    Search the HTML file at `path` for links, CHUNK_SIZE bytes at a time.
+    Return the list of links found and the number of bytes read.
+
+    A tag may be split between chunks, so a tag still open at the end of
+    a chunk (if shorter than OVERLAP bytes) is held back and searched along
+    with the next one.
+    """
+    links = []
+    size = 0
+    carry = b""
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            size += len(chunk)
+            text = carry + chunk
+            start = text.rfind(b"<")
+            if start >= 0 and text.find(b">", start) < 0 and len(text) - start <= OVERLAP:
+                carry = text[start:]
+                text = text[:start]
+            else:
+                carry = b""
+            links.extend(LINK.findall(text))
+    links.extend(LINK.findall(carry))
+    return [link.decode("utf-8", "replace") for link in links], size
+
+
+def parse_links(path, index):
+    """
+    Return an array of the page numbers that the HTML file at `path` links
+    to, keeping only links to pages in `index`, and the number of bytes read.
+    """
+    links, size = read_links(path)
+    return array("q", (index[link] for link in links if link in index)), size
+
+
+def print_progress(done, total, bytes_read, seconds):
+    """
+    Print crawl progress and throughput.
+    """
+    seconds = max(seconds, 1e-9)
+    print(f"Crawled {done}/{total} pages, {bytes_read / 1e6:.1f} MB "
+          f"in {seconds:.2f}s ({done / seconds:.0f} pages/s, "
+          f"{bytes_read / 1e6 / seconds:.1f} MB/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
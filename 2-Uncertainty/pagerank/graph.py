@@ -0,0 +1,205 @@
+import functools
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+
+class LinkGraph():
+    """
+    Link structure of a corpus with pages numbered 0 to N - 1.
+
+    Outgoing links are stored as compressed sparse rows: the pages linked
+    to by page i are `targets[offsets[i]:offsets[i + 1]]`, in increasing
+    order and without repeats or self-links. Requires numpy.
+    """
+
+    def __init__(self, pages, offsets, targets):
+        if np is None:
+            raise ImportError("LinkGraph requires numpy")
+        self.pages = pages
+        self.offsets = offsets
+        self.targets = targets
+
+        # Only per-page arrays are built up front; anything with an entry
+        # per link is built the first time it is needed
+        self.out_degree = np.diff(offsets)
+        self.dangling = self.out_degree == 0
+
+    @functools.cached_property
+    def sources(self):
+        """
+        The page each link comes from, parallel to `targets`.
+        """
+        return np.repeat(np.arange(len(self)), self.out_degree)
+
+    @functools.cached_property
+    def weights(self):
+        """
+        The share of its source page's rank each link carries, parallel
+        to `targets`.
+        """
+        return np.repeat(1 / np.maximum(self.out_degree, 1), self.out_degree)
+
+    @functools.cached_property
+    def matrix(self):
+        """
+        Column-stochastic transition matrix over pages that have links, as a
+        scipy.sparse matrix; column j spreads page j's rank evenly over the
+        pages it links to. The link arrays are already this matrix in
+        compressed sparse columns.
+        """
+        n = len(self)
+        return scipy.sparse.csc_matrix((self.weights, self.targets, self.offsets), shape=(n, n))
+
+    @functools.cached_property
+    def inbound(self):
+        """
+        Incoming links as compressed sparse rows: the pages linking to page
+        i are `sources[offsets[i]:offsets[i + 1]]`, and `weights` holds the
+        share of each linking page's rank that the link carries.
+        Returns an (offsets, sources, weights) tuple.
+        """
+        order = np.argsort(self.targets, kind="stable")
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.targets, minlength=len(self)), out=offsets[1:])
+        return offsets, self.sources[order], self.weights[order]
+
+    @functools.cached_property
+    def index(self):
+        """
+        Dictionary mapping each page name to its number.
+        """
+        return {page: i for i, page in enumerate(self.pages)}
+
+    def __len__(self):
+        return len(self.pages)
+
+    def links(self, i):
+        """
+        Return the array of pages linked to by page `i`.
+        """
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def propagate(self, ranks):
+        """
+        Return the rank each page receives through links when every page
+        with links splits its rank evenly among them.
+
+        `ranks` may be a vector of length N or an N x K matrix holding
+        K rank vectors as columns.
+        """
+        if scipy is not None:
+            return self.matrix @ ranks
+        offsets, sources, weights = self.inbound
+        return sum_segments(ranks, sources, weights, offsets[:-1], offsets[1:])
+
+    def step(self, ranks, damping_factor):
+        """
+        Apply one step of the PageRank random surfer model to `ranks`.
+        Rank on pages with no links is spread evenly over every page, as if
+        they linked to all pages.
+        """
+        n = len(self)
+        dangling = ranks[self.dangling].sum(axis=0)
+        return (
+            damping_factor * (self.propagate(ranks) + dangling / n)
+            + (1 - damping_factor) * ranks.sum(axis=0) / n
+        )
+
+
+def sum_segments(ranks, sources, weights, starts, ends):
+    """
+    Return, for each segment k, the sum of ranks[sources[i]] * weights[i]
+    for i from starts[k] up to ends[k]. Segments must be laid out back to
+    back, so that each one ends where the next starts.
+    """
+    weights = weights if ranks.ndim == 1 else weights[:, None]
+    shares = ranks[sources] * weights
+
+    # Pad with a zero row so every start is a valid index for reduceat,
+    # which returns the row at the start itself for empty segments
+    shares = np.concatenate([shares, np.zeros_like(ranks[:1])])
+    result = np.add.reduceat(shares, starts)
+    result[starts == ends] = 0
+    return result
+
+
+def graph_from_edges(pages, sources, targets):
+    """
+    Build a LinkGraph from a list of page names and an edge list, where
+    page `sources[k]` links to page `targets[k]`. Self-links and
+    repeated links are dropped.
+    """
+    pages = list(pages)
+    n = len(pages)
+
+    # Sort edges by source, then target, and drop duplicates and self-links
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    keep = sources != targets
+    edges = np.sort(sources[keep] * n + targets[keep])
+    edges = edges[np.diff(edges, prepend=-1) != 0]
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    if n:
+        np.cumsum(np.bincount(edges // n, minlength=n), out=offsets[1:])
+        edges %= n
+    return LinkGraph(pages, offsets, edges)
+
+
+def graph_from_corpus(corpus):
+    """
+    Build a LinkGraph from a corpus dictionary mapping each page name
+    to the set of page names it links to.
+    """
+    pages = list(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    sources = []
+    targets = []
+    for page, links in corpus.items():
+        for link in links:
+            if link in index:
+                sources.append(index[page])
+                targets.append(index[link])
+    return graph_from_edges(pages, sources, targets)
+
+
+def save_graph(graph, path):
+    """
+    Save a LinkGraph to the directory `path`, as a table of page names
+    (one per line) and .npy arrays that load_graph can memory-map.
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "pages.txt"), "w") as f:
+        f.writelines(page + "\n" for page in graph.pages)
+    np.save(os.path.join(path, "offsets.npy"), np.asarray(graph.offsets))
+    np.save(os.path.join(path, "targets.npy"), np.asarray(graph.targets))
+
+
+def load_graph(path):
+    """
+    Load a LinkGraph saved by save_graph. The link arrays are memory-mapped
+    rather than read, and LinkGraph only builds its per-link arrays once
+    they are used, so loading takes time proportional to the number of
+    pages, not links.
+    """
+    with open(os.path.join(path, "pages.txt")) as f:
+        pages = f.read().splitlines()
+    offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+    targets = np.load(os.path.join(path, "targets.npy"), mmap_mode="r")
+    return LinkGraph(pages, offsets, targets)
+
+
+def is_saved_graph(path):
+    """
+    Return True if `path` is a directory holding a graph saved by save_graph.
+    """
+    return os.path.isfile(os.path.join(path, "offsets.npy"))
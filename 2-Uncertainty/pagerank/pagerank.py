@@ -1,24 +1,88 @@
+import math
+import multiprocessing
 import os
 import random
-import re
 import sys
+import time
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from crawler import crawl_graph, read_links
+from graph import graph_from_corpus, is_saved_graph, load_graph
 
 DAMPING = 0.85
+TOLERANCE = 0.001
+EXTRAPOLATION_PERIOD = 10
 SAMPLES = 10000
+WALKERS = 1000
+BURN_IN_ERROR = 1e-6
+
+# Number of standard errors either side of an estimate in a 95% confidence interval
+CONFIDENCE_Z = 1.96
 
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
-    ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
-    print(f"PageRank Results from Sampling (n = {SAMPLES})")
-    for page in sorted(ranks):
-        print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python pagerank.py corpus [processes]")
+
+    # Without numpy, only a directory of HTML pages can be ranked, one sample at a time
+    if np is None:
+        if len(sys.argv) == 3 or is_saved_graph(sys.argv[1]):
+            sys.exit("Saved graphs and parallel sampling require numpy")
+        corpus = crawl(sys.argv[1])
+        ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
+        print(f"PageRank Results from Sampling (n = {SAMPLES})")
+        for page in sorted(ranks):
+            print(f"  {page}: {ranks[page]:.4f}")
+        ranks = iterate_pagerank(corpus, DAMPING)
+        print(f"PageRank Results from Iteration")
+        for page in sorted(ranks):
+            print(f"  {page}: {ranks[page]:.4f}")
+        return
+
+    # A corpus may be a directory of HTML pages, or a graph saved by crawler.py
+    if is_saved_graph(sys.argv[1]):
+        graph = load_graph(sys.argv[1])
+    else:
+        graph = crawl_graph(sys.argv[1])
+    pages = sorted(range(len(graph)), key=lambda i: graph.pages[i])
+
+    if len(sys.argv) == 3:
+        counts, batches = parallel_sample(
+            graph, DAMPING, SAMPLES, processes=int(sys.argv[2])
+        )
+        ranks = counts / SAMPLES
+        variance, error = sampling_error(batches)
+        print(f"PageRank Results from Sampling (n = {SAMPLES}, "
+              f"{len(batches)} batches, 95% confidence)")
+        for i in pages:
+            print(f"  {graph.pages[i]}: {ranks[i]:.4f} "
+                  f"± {CONFIDENCE_Z * error[i]:.4f} "
+                  f"(batch variance {variance[i]:.2e})")
+    else:
+        ranks = sample_visits(graph, DAMPING, SAMPLES) / SAMPLES
+        print(f"PageRank Results from Sampling (n = {SAMPLES})")
+        for i in pages:
+            print(f"  {graph.pages[i]}: {ranks[i]:.4f}")
+
+    # Saved graphs keep their ranks, so later runs can start from them; an
+    # update needs a smaller tolerance to be as accurate as iterating again
+    saved = is_saved_graph(sys.argv[1])
+    if saved and has_saved_ranks(sys.argv[1]):
+        ranks = update_pagerank(
+            graph, DAMPING, *load_ranks(sys.argv[1]), tolerance=TOLERANCE / 100
+        )
+    else:
+        ranks = power_iteration(graph, DAMPING)
+    if saved:
+        save_ranks(sys.argv[1], graph.pages, ranks)
     print(f"PageRank Results from Iteration")
-    for page in sorted(ranks):
-        print(f"  {page}: {ranks[page]:.4f}")
+    for i in pages:
+        print(f"  {graph.pages[i]}: {ranks[i]:.4f}")
 
 
 def crawl(directory):
@@ -27,25 +91,22 @@ def crawl(directory):
     Return a dictionary where each key is a page, and values are
     a list of all other pages in the corpus that are linked to by the page.
     """
-    pages = dict()
-
-    # Extract all links from HTML files
-    for filename in os.listdir(directory):
-        if not filename.endswith(".html"):
-            continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
-
-    # Only include links to other pages in the corpus
-    for filename in pages:
-        pages[filename] = set(
-            link for link in pages[filename]
-            if link in pages
-        )
-
-    return pages
+    if np is None:
+        pages = [filename for filename in os.listdir(directory) if filename.endswith(".html")]
+        links = {
+            filename: set(read_links(os.path.join(directory, filename))[0]) - {filename}
+            for filename in pages
+        }
+        return {
+            filename: set(link for link in links[filename] if link in links)
+            for filename in pages
+        }
+
+    graph = crawl_graph(directory)
+    return {
+        page: set(graph.pages[link] for link in graph.links(i))
+        for i, page in enumerate(graph.pages)
+    }
 
 
 def transition_model(corpus, page, damping_factor):
@@ -80,7 +141,7 @@ def transition_model(corpus, page, damping_factor):
     #raise NotImplementedError
 
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, processes=None, seed=None):
     """
     Return PageRank values for each page by sampling `n` pages
     according to transition model, starting with a page at random.
@@ -88,34 +149,173 @@ def sample_pagerank(corpus, damping_factor, n):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
+
+    If `processes` is given, the samples are split across that many
+    worker processes. Without numpy, samples are drawn one at a time in
+    a single process.
     """
+    if np is None:
+        if processes is not None:
+            raise ImportError("Parallel sampling requires numpy")
+        return sample_corpus(corpus, damping_factor, n, seed)
+
+    graph = graph_from_corpus(corpus)
+    if processes is None:
+        counts = sample_visits(graph, damping_factor, n, seed=seed)
+    else:
+        counts, _ = parallel_sample(
+            graph, damping_factor, n, processes=processes, seed=seed
+        )
+    return dict(zip(graph.pages, (counts / n).tolist()))
 
-    #Randomly choice initial page
-    random_page = random.choice(list(corpus))
 
-    results={}
-    for i in corpus:
-        results[i]= 0
+def sample_corpus(corpus, damping_factor, n, seed=None):
+    """
+    Pure Python sample_pagerank for when numpy is not installed: a single
+    surfer takes `n` steps of the transition model, following one of the
+    current page's links or, on a page without links, jumping anywhere.
+    """
+    rng = random.Random(seed)
+    pages = list(corpus)
+    links = {page: [link for link in corpus[page] if link in corpus] for page in pages}
+    counts = dict.fromkeys(pages, 0)
 
-    for x in range(n):
+    page = rng.choice(pages)
+    for _ in range(n):
+        if links[page] and rng.random() < damping_factor:
+            page = rng.choice(links[page])
+        else:
+            page = rng.choice(pages)
+        counts[page] += 1
 
-        page_weights = transition_model(corpus, random_page,damping_factor)
+    return {page: count / n for page, count in counts.items()}
 
-        weight_dict = list(page_weights.values())
 
-        page_options = list(page_weights)
-        random_page = random.choices(page_options, weights=weight_dict, cum_weights=None, k=1)[0]
-        
-        results[random_page] +=1
+def parallel_sample(graph, damping_factor, n, processes=None, batches=None, seed=None):
+    """
+    Split `n` samples of a LinkGraph into batches run across a pool of
+    worker processes, and merge their visit counts.
 
-    for i in results:
-        results[i]= results[i]/n
+    Each batch draws from its own random stream spawned from `seed`, so
+    results depend only on `seed` and `batches`, not on how batches are
+    scheduled. There are 10 batches by default, or one per process
+    if that is more, but never more batches than samples.
+
+    Return the merged visit counts, and a list of (counts, samples) pairs
+    giving each batch's visit counts and number of samples.
+    """
+    processes = processes or os.cpu_count()
+    batches = min(batches or max(processes, 10), max(n, 1))
+    sizes = [n // batches + (i < n % batches) for i in range(batches)]
+    streams = np.random.SeedSequence(seed).spawn(batches)
+
+    with multiprocessing.Pool(
+        processes, initializer=set_worker_graph, initargs=(graph,)
+    ) as pool:
+        results = pool.starmap(
+            sample_batch,
+            [(damping_factor, size, stream) for size, stream in zip(sizes, streams)]
+        )
+
+    return sum(results), list(zip(results, sizes))
+
+
+def set_worker_graph(graph):
+    """
+    Store the graph in a worker process, so it is sent to each worker
+    once rather than with every batch.
+    """
+    global worker_graph
+    worker_graph = graph
+
+
+def sample_batch(damping_factor, n, seed):
+    """
+    Return visit counts for `n` samples of the worker's graph.
+    """
+    return sample_visits(worker_graph, damping_factor, n, seed=seed)
 
-    return results
-    #raise NotImplementedError
 
+def sampling_error(batches):
+    """
+    Given (counts, samples) pairs from `parallel_sample`, return the
+    variance of each page's estimate between batches, and the standard
+    error of each page's estimate from all batches together. Batches
+    without samples carry no information, so are left out.
+    """
+    batches = [(batch, size) for batch, size in batches if size]
+    counts = np.array([batch for batch, _ in batches], dtype=float)
+    sizes = np.array([size for _, size in batches], dtype=float)
+    estimates = counts / sizes[:, None]
+    mean = counts.sum(axis=0) / sizes.sum()
+
+    # Batches are weighted by size, in case `n` did not split evenly
+    weights = sizes / sizes.sum()
+    variance = (weights[:, None] * (estimates - mean) ** 2).sum(axis=0)
+    variance *= len(batches) / max(len(batches) - 1, 1)
+    return variance, np.sqrt(variance / len(batches))
+
+
+def sample_visits(graph, damping_factor, n, walkers=WALKERS, seed=None):
+    """
+    Return an array counting how often each page of a LinkGraph is visited
+    in `n` samples of the transition model.
+
+    The samples are shared between `walkers` random surfers that each start
+    on a random page and move together, one vectorized step at a time.
+    Surfers take a few uncounted steps first, so that where they started
+    no longer biases the estimate.
+    """
+    rng = np.random.default_rng(seed)
+    pages = len(graph)
+    counts = np.zeros(pages, dtype=np.int64)
+    current = rng.integers(pages, size=min(walkers, n))
+
+    # Starting bias shrinks by a factor of `damping_factor` with every step
+    if 0 < damping_factor < 1:
+        burn_in = min(math.ceil(math.log(BURN_IN_ERROR) / math.log(damping_factor)), 1000)
+    else:
+        burn_in = 0 if damping_factor <= 0 else 1000
+    for _ in range(burn_in):
+        current = walk(graph, current, damping_factor, rng)
+
+    # Visits are counted in batches, so counting costs O(1) per sample
+    visits = []
+    pending = 0
+    remaining = n
+    while remaining:
+        current = walk(graph, current[:remaining], damping_factor, rng)
+        remaining -= len(current)
+
+        visits.append(current)
+        pending += len(current)
+        if pending >= pages or not remaining:
+            counts += np.bincount(np.concatenate(visits), minlength=pages)
+            visits = []
+            pending = 0
+
+    return counts
+
+
+def walk(graph, current, damping_factor, rng):
+    """
+    Move every surfer in the array `current` one step according to the
+    transition model, and return their new pages.
 
-def iterate_pagerank(corpus, damping_factor):
+    Following a link picks a random offset into the page's slice of the
+    graph's link array, so each step takes constant time per surfer.
+    """
+    #With probability `damping_factor` follow a link, otherwise go to any page
+    follow = rng.random(len(current)) < damping_factor
+    follow &= ~graph.dangling[current]
+    following = current[follow]
+    choice = (rng.random(len(following)) * graph.out_degree[following]).astype(np.int64)
+    current = rng.integers(len(graph), size=len(current))
+    current[follow] = graph.targets[graph.offsets[following] + choice]
+    return current
+
+
+def iterate_pagerank(corpus, damping_factor, tolerance=TOLERANCE):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
@@ -124,47 +324,342 @@ def iterate_pagerank(corpus, damping_factor):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    ranks_dict={}
-    for i in corpus:
-        ranks_dict[i] = 1/len(corpus)
-    page_options = list(corpus)
-    page_links = list(corpus.values())
-    
-    finished = False
-    while not finished:
-        old_ranks = ranks_dict.copy()
-        
-        for page in page_options:
-            P_link = 0
-            index = 0
+    if np is None:
+        return iterate_corpus(corpus, damping_factor, tolerance)
+
+    graph = graph_from_corpus(corpus)
+    ranks = power_iteration(graph, damping_factor, tolerance)
+    return dict(zip(graph.pages, ranks.tolist()))
+
+
+def iterate_corpus(corpus, damping_factor, tolerance=TOLERANCE):
+    """
+    Pure Python iterate_pagerank for when numpy is not installed, applying
+    the same transition model as power_iteration one link at a time.
+    """
+    n = len(corpus)
+    links = {
+        page: [link for link in set(corpus[page]) if link in corpus and link != page]
+        for page in corpus
+    }
+    ranks = {page: 1 / n for page in corpus}
+
+    while True:
+        # Rank on pages with no links is spread evenly over every page
+        dangling = sum(ranks[page] for page in corpus if not links[page])
+        new_ranks = dict.fromkeys(corpus, (1 - damping_factor) / n + damping_factor * dangling / n)
+        for page in corpus:
+            for link in links[page]:
+                new_ranks[link] += damping_factor * ranks[page] / len(links[page])
+
+        #Make sure probability add to one
+        total = sum(new_ranks.values())
+        for page in new_ranks:
+            new_ranks[page] /= total
+
+        #Check if weights between previous and current differ by greater than tolerance
+        change = max(abs(new_ranks[page] - ranks[page]) for page in corpus)
+        ranks = new_ranks
+        if change <= tolerance:
+            return ranks
+
+
+def solve_pagerank(graph, damping_factor, method="power", tolerance=TOLERANCE, ranks=None):
+    """
+    Return the PageRank vector of a LinkGraph computed by one of the
+    METHODS, along with its history: a list holding, for each iteration,
+    the L1 norm of the change it made and the seconds elapsed so far.
+    """
+    history = []
+    ranks = METHODS[method](graph, damping_factor, tolerance, ranks, history)
+    return ranks, history
 
-            for linked_pages in page_links:
-                if page in linked_pages:
-                    i_page = page_options[index]
-                    P_link += ranks_dict[i_page]/len(linked_pages)
-                index+=1
 
-            P_page = ((1-damping_factor)/len(corpus)) + (damping_factor * P_link)
-            ranks_dict[page] = P_page
+def record(history, change, start):
+    """
+    Add an iteration's L1 change and the time since `start` to `history`,
+    if a history is being kept.
+    """
+    if history is not None:
+        history.append((float(change), time.perf_counter() - start))
+
+
+def power_iteration(graph, damping_factor, tolerance=TOLERANCE, ranks=None, history=None):
+    """
+    Return the PageRank vector of a LinkGraph, applying the transition
+    model until no page's value changes by more than `tolerance`.
+
+    Iteration starts from `ranks` if given, and from the uniform
+    distribution otherwise.
+    """
+    start = time.perf_counter()
+    n = len(graph)
+    if ranks is None:
+        ranks = np.full(n, 1 / n)
+
+    while True:
+        new_ranks = graph.step(ranks, damping_factor)
 
         #Make sure probability add to one
-        P_total = 0
-        for page in ranks_dict:
-            P_total += ranks_dict[page]
-        for page in ranks_dict:
-            ranks_dict[page] = ranks_dict[page]/P_total
-
-        #Check if weights between previous and current differ by greater than 0.001
-        for page in page_options:
-            diff = old_ranks[page]-ranks_dict[page]
-            if abs(diff)> 0.001:
-                finished = False
+        new_ranks /= new_ranks.sum()
+
+        #Check if weights between previous and current differ by greater than tolerance
+        change = np.abs(new_ranks - ranks)
+        record(history, change.sum(), start)
+        ranks = new_ranks
+        if change.max() <= tolerance:
+            return ranks
+
+
+def extrapolated_iteration(graph, damping_factor, tolerance=TOLERANCE, ranks=None, history=None):
+    """
+    Power iteration that, every EXTRAPOLATION_PERIOD iterations, jumps
+    ahead using quadratic extrapolation from the last four iterates.
+    """
+    start = time.perf_counter()
+    n = len(graph)
+    if ranks is None:
+        ranks = np.full(n, 1 / n)
+    recent = deque(maxlen=4)
+
+    iteration = 0
+    while True:
+        new_ranks = graph.step(ranks, damping_factor)
+        new_ranks /= new_ranks.sum()
+        change = np.abs(new_ranks - ranks)
+        record(history, change.sum(), start)
+        ranks = new_ranks
+        if change.max() <= tolerance:
+            return ranks
+
+        iteration += 1
+        recent.append(ranks)
+        if iteration % EXTRAPOLATION_PERIOD == 0 and len(recent) == 4:
+            ranks = quadratic_extrapolation(*recent)
+            recent.clear()
+
+
+def quadratic_extrapolation(x0, x1, x2, x3):
+    """
+    Estimate the limit of a sequence of iterates from its last four, by
+    assuming the error lies mostly along the transition matrix's second
+    and third eigenvectors (Kamvar et al., 2003).
+    """
+    y1 = x1 - x0
+    y2 = x2 - x0
+    y3 = x3 - x0
+    gamma, *_ = np.linalg.lstsq(np.column_stack([y1, y2]), -y3, rcond=None)
+    beta0 = gamma[0] + gamma[1] + 1
+    beta1 = gamma[1] + 1
+    ranks = np.maximum(beta0 * x1 + beta1 * x2 + x3, 0)
+    return ranks / ranks.sum()
+
+
+def gauss_seidel(graph, damping_factor, tolerance=TOLERANCE, ranks=None, history=None):
+    """
+    Return the PageRank vector of a LinkGraph, updating one page at a time
+    in place, so each page's update already uses the new ranks of the
+    pages before it. Sweeps run in pure Python, so this takes fewer
+    iterations than power iteration but each one is slower.
+    """
+    start = time.perf_counter()
+    n = len(graph)
+    ranks = [1 / n] * n if ranks is None else np.asarray(ranks, dtype=float).tolist()
+    offsets, sources, weights = (array.tolist() for array in graph.inbound)
+    dangling = graph.dangling.tolist()
+    dangling_rank = sum(rank for rank, empty in zip(ranks, dangling) if empty)
+    teleport = (1 - damping_factor) / n
+
+    while True:
+        total_change = 0
+        largest_change = 0
+        for page in range(n):
+            received = 0
+            for k in range(offsets[page], offsets[page + 1]):
+                received += ranks[sources[k]] * weights[k]
+            new_rank = teleport + damping_factor * (received + dangling_rank / n)
+            change = new_rank - ranks[page]
+            if dangling[page]:
+                dangling_rank += change
+            ranks[page] = new_rank
+            total_change += abs(change)
+            largest_change = max(largest_change, abs(change))
+
+        #Make sure probability add to one
+        total = sum(ranks)
+        ranks = [rank / total for rank in ranks]
+        dangling_rank /= total
+
+        record(history, total_change, start)
+        if largest_change <= tolerance:
+            return np.array(ranks)
+
+
+def personalized_pagerank(corpus, damping_factor, seed_sets, tolerance=TOLERANCE):
+    """
+    Return PageRank values personalized to each of `seed_sets`, where a
+    surfer who teleports (or reaches a page with no links) jumps to a page
+    chosen uniformly from the seed set instead of from the whole corpus.
+
+    Return a list with one dictionary per seed set, mapping page names to
+    their PageRank value. All seed sets are iterated together.
+    """
+    graph = graph_from_corpus(corpus)
+    ranks = personalized_iteration(
+        graph, damping_factor, teleport_matrix(graph, seed_sets), tolerance
+    )
+    return [dict(zip(graph.pages, column)) for column in ranks.T.tolist()]
+
+
+def teleport_matrix(graph, seed_sets):
+    """
+    Return an N x K matrix whose k-th column is the uniform distribution
+    over the pages named in the k-th seed set.
+    """
+    teleport = np.zeros((len(graph), len(seed_sets)))
+    for k, seeds in enumerate(seed_sets):
+        rows = [graph.index[page] for page in seeds]
+        if not rows:
+            raise ValueError(f"Seed set {k} is empty")
+        teleport[rows, k] = 1 / len(rows)
+    return teleport
+
+
+def personalized_iteration(graph, damping_factor, teleport, tolerance=TOLERANCE):
+    """
+    Return an N x K matrix of PageRank vectors, one for each column of the
+    N x K `teleport` matrix of distributions, iterating all K at once so
+    each step is a single sparse matrix product.
+    """
+    # Teleporting only ever adds rank to seed pages, so only their rows are touched
+    rows = np.flatnonzero(teleport.any(axis=1))
+    seeds = teleport[rows]
+
+    ranks = teleport.copy()
+    while True:
+        dangling = ranks[graph.dangling].sum(axis=0)
+        new_ranks = graph.propagate(ranks)
+        new_ranks *= damping_factor
+        new_ranks[rows] += (damping_factor * dangling + 1 - damping_factor) * seeds
+
+        ranks -= new_ranks
+        finished = np.abs(ranks).max() <= tolerance
+        ranks = new_ranks
+        if finished:
+            return ranks
+
+
+def update_pagerank(graph, damping_factor, pages, ranks, tolerance=TOLERANCE):
+    """
+    Return the PageRank vector of a LinkGraph, given the `ranks` of a list
+    of `pages` computed for an earlier version of the graph.
+
+    Previous ranks are the starting point, with new pages given an even
+    share. Error is then pushed out from the pages whose rank is wrong
+    rather than swept over the whole graph: a page's residual is how much
+    its rank would change in one step of the transition model, and pushing
+    it adds the residual to the page's rank and passes a damped share on to
+    each page it links to. Every page whose residual is above `tolerance`
+    is pushed at once, so after a small edit each round only touches the
+    few pages near the edit.
+
+    This stops once no page's residual is above `tolerance`, the same test
+    power_iteration applies to the change it makes to each page. But
+    pushing leaves many pages with residuals just under `tolerance`, where
+    power iteration shrinks every page's change together, so for the same
+    accuracy this needs a tolerance ten to a hundred times smaller (see
+    `python benchmark.py --update`). When an edit's effect reaches most of
+    the graph, as in graphs whose links are spread evenly, pushing ends up
+    touching every page and is no faster than power_iteration started
+    from the old ranks.
+    """
+    n = len(graph)
+    if list(pages) == graph.pages:
+        ranks = np.array(ranks, dtype=float)
+    else:
+        previous = dict(zip(pages, np.asarray(ranks).tolist()))
+        ranks = np.array([previous.get(page, 1 / n) for page in graph.pages])
+    ranks /= ranks.sum()
+    residuals = graph.step(ranks, damping_factor) - ranks
+
+    # Residual added to every page at once, from rank pushed out of pages
+    # with no links and from teleporting, kept apart so pushing costs
+    # nothing for pages the push does not link to
+    everywhere = 0
+
+    # Only pages whose residual a round changed are checked in the next,
+    # but every page is checked before stopping
+    frontier = np.flatnonzero(np.abs(residuals) > tolerance)
+    while True:
+        if not len(frontier):
+            frontier = np.flatnonzero(np.abs(residuals + everywhere) > tolerance)
+            if not len(frontier):
                 break
-            else:
-                finished = True
- 
-    return ranks_dict
-    #raise NotImplementedError
+        pushed = residuals[frontier] + everywhere
+        ranks[frontier] += pushed
+        residuals[frontier] = -everywhere
+
+        # Spread each pushed page's residual over its links, with one sparse
+        # product once the frontier is a large part of the graph
+        dangling = graph.dangling[frontier]
+        everywhere += (
+            damping_factor * pushed[dangling].sum() + (1 - damping_factor) * pushed.sum()
+        ) / n
+        if len(frontier) > n // 16:
+            spread = np.zeros(n)
+            spread[frontier] = pushed
+            residuals += damping_factor * graph.propagate(spread)
+            frontier = np.flatnonzero(np.abs(residuals + everywhere) > tolerance)
+        else:
+            degrees = graph.out_degree[frontier]
+            starts = graph.offsets[frontier]
+            positions = np.repeat(starts - np.cumsum(degrees) + degrees, degrees)
+            positions += np.arange(len(positions))
+            touched = graph.targets[positions]
+            shares = damping_factor * pushed / np.maximum(degrees, 1)
+            np.add.at(residuals, touched, np.repeat(shares, degrees))
+            touched = np.unique(touched)
+            frontier = touched[np.abs(residuals[touched] + everywhere) > tolerance]
+
+    # Nothing may have reached tolerance from the residual left everywhere,
+    # but together it can outweigh the rest, so it is pushed to every page
+    ranks += everywhere
+    return ranks / ranks.sum()
+
+
+def save_ranks(path, pages, ranks):
+    """
+    Save a rank vector, with the names of the pages it ranks, to the
+    directory `path`.
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "ranked_pages.txt"), "w") as f:
+        f.writelines(page + "\n" for page in pages)
+    np.save(os.path.join(path, "ranks.npy"), np.asarray(ranks))
+
+
+def load_ranks(path):
+    """
+    Return the list of pages and the rank vector saved by save_ranks.
+    """
+    with open(os.path.join(path, "ranked_pages.txt")) as f:
+        pages = f.read().splitlines()
+    return pages, np.load(os.path.join(path, "ranks.npy"))
+
+
+def has_saved_ranks(path):
+    """
+    Return True if the directory `path` holds ranks saved by save_ranks.
+    """
+    return os.path.isfile(os.path.join(path, "ranks.npy"))
+
+
+# Ways of computing PageRank by iteration, by name
+METHODS = {
+    "power": power_iteration,
+    "extrapolation": extrapolated_iteration,
+    "gauss-seidel": gauss_seidel,
+}
 
 
 if __name__ == "__main__":
@@ -3,6 +3,8 @@ class Variable():
     ACROSS = "across"
     DOWN = "down"
 
+    __slots__ = ("i", "j", "direction", "length", "cells")
+
     def __init__(self, i, j, direction, length):
         """Create a new variable with starting point, direction, and length."""
         self.i = i
@@ -108,26 +110,33 @@ class Crossword():
         # For any pair of variables v1, v2, their overlap is either:
         #    None, if the two variables do not overlap; or
         #    (i, j), where v1's ith character overlaps v2's jth character
-        self.overlaps = dict()
-        for v1 in self.variables:
-            for v2 in self.variables:
-                if v1 == v2:
-                    continue
-                cells1 = v1.cells
-                cells2 = v2.cells
-                intersection = set(cells1).intersection(cells2)
-                if not intersection:
-                    self.overlaps[v1, v2] = None
-                else:
-                    intersection = intersection.pop()
-                    self.overlaps[v1, v2] = (
-                        cells1.index(intersection),
-                        cells2.index(intersection)
-                    )
+        # Only overlapping pairs are stored; looking up any other pair gives None
+        self.overlaps = Overlaps()
+        cell_variables = dict()
+        for variable in self.variables:
+            for k, cell in enumerate(variable.cells):
+                cell_variables.setdefault(cell, []).append((variable, k))
+        for sharing in cell_variables.values():
+            for v1, k1 in sharing:
+                for v2, k2 in sharing:
+                    if v1 != v2:
+                        self.overlaps[v1, v2] = (k1, k2)
+
+        # Overlapping variables of each variable, found once
+        self._neighbors = {var: [] for var in self.variables}
+        for v1, v2 in self.overlaps:
+            self._neighbors[v1].append(v2)
+        self._neighbors = {
+            var: tuple(neighbors) for var, neighbors in self._neighbors.items()
+        }
 
     def neighbors(self, var):
-        """Given a variable, return set of overlapping variables."""
-        return set(
-            v for v in self.variables
-            if v != var and self.overlaps[v, var]
-        )
+        """Given a variable, return tuple of overlapping variables."""
+        return self._neighbors[var]
+
+
+class Overlaps(dict):
+    """Dictionary of overlaps that gives None for variables that do not overlap."""
+
+    def __missing__(self, key):
+        return None
@@ -1,4 +1,7 @@
+import heapq
+import itertools
 import sys
+from collections import deque
 
 from crossword import *
 
@@ -10,11 +13,91 @@ class CrosswordCreator():
         Create new CSP crossword generate.
         """
         self.crossword = crossword
+
+        # Words are numbered, and each domain is a bitset of word numbers
+        # (a Python int with bit k set if word k is still possible)
+        self.words = sorted(self.crossword.words)
+        self.index = {word: k for k, word in enumerate(self.words)}
+        self.alphabet = sorted(set("".join(self.words)))
+
+        # Bitsets of the words of each length, and of the words of each
+        # length with each letter at each position
+        lengths = dict()
+        letters = dict()
+        for k, word in enumerate(self.words):
+            lengths.setdefault(len(word), []).append(k)
+            for position, letter in enumerate(word):
+                letters.setdefault((len(word), position, letter), []).append(k)
+        self.lengths = {key: self.bitset(ks) for key, ks in lengths.items()}
+        self.letters = {key: self.bitset(ks) for key, ks in letters.items()}
+
+        everything = (1 << len(self.words)) - 1
         self.domains = {
-            var: self.crossword.words.copy()
+            var: everything
             for var in self.crossword.variables
         }
 
+        # Undo trail of (variable, previous domain) for every domain change,
+        # so search can restore domains without copying them
+        self.trail = []
+
+        # Words used by the assignment being searched
+        self.used = set()
+
+        # Heap of (domain size, -degree, push count, variable) that search
+        # chooses its next variable from. A variable is pushed again whenever
+        # its domain changes or it is unassigned, so only entries matching its
+        # current size are valid
+        self.queue = []
+        self.pushes = itertools.count()
+
+    def bitset(self, numbers):
+        """
+        Return the bitset of a list of word numbers.
+        """
+        bits = bytearray((len(self.words) + 7) // 8)
+        for k in numbers:
+            bits[k >> 3] |= 1 << (k & 7)
+        return int.from_bytes(bits, "little")
+
+    def set_domain(self, var, bits):
+        """
+        Change the domain of `var` to the bitset `bits`, recording the old
+        domain on the undo trail.
+        """
+        self.trail.append((var, self.domains[var]))
+        self.domains[var] = bits
+        self.prioritize(var)
+
+    def undo(self, mark):
+        """
+        Restore every domain changed since the undo trail had length `mark`.
+        """
+        while len(self.trail) > mark:
+            var, bits = self.trail.pop()
+            self.domains[var] = bits
+            self.prioritize(var)
+
+    def prioritize(self, var):
+        """
+        Queue `var` for selection with the current size of its domain.
+        """
+        heapq.heappush(self.queue, (
+            self.domains[var].bit_count(),
+            -len(self.crossword.neighbors(var)),
+            next(self.pushes),
+            var
+        ))
+
+    def words_in(self, bits):
+        """
+        Return the list of words in a bitset, in word number order.
+        """
+        return [
+            self.words[k]
+            for k, bit in enumerate(bin(bits)[:1:-1]) if bit == "1"
+        ]
+
     def letter_grid(self, assignment):
         """
         Return 2D array representing a given assignment.
@@ -100,14 +183,9 @@ class CrosswordCreator():
          constraints; in this case, the length of the word.)
         """
 
+        #Keep only the words that are the correct length for each variable
         for variable in self.domains:
-            variable_len = variable.length
-            words_copy = self.domains[variable].copy()
-
-            #Check if each word is the correct length for variable. If not remove word
-            for word in words_copy:
-                if variable_len != len(word):
-                    self.domains[variable].remove(word)
+            self.domains[variable] &= self.lengths.get(variable.length, 0)
 
     def revise(self, x, y):
         """
@@ -118,29 +196,24 @@ class CrosswordCreator():
         Return True if a revision was made to the domain of `x`; return
         False if no revision was made.
         """
-        revised = False
 
         #If there's no overlaps between x and y, then automatically arc consistent
-        if self.crossword.overlaps[x,y] == None:
-            return revised
-        else:
-            x_overlap =self.crossword.overlaps[x,y][0]
-            y_overlap =self.crossword.overlaps[x,y][1]
-
-        x_words = self.domains[x].copy()
-        #Check each word in x has a letter that matches a word in y, else remove
-        for x_word in x_words:
-            word_found = False
-            for y_word in self.domains[y]:
-                if x_word[x_overlap] == y_word[y_overlap]:
-                    word_found = True
-                    break
-            if not word_found:
-                self.domains[x].remove(x_word)
-                revised = True
+        if self.crossword.overlaps[x, y] is None:
+            return False
+        x_overlap, y_overlap = self.crossword.overlaps[x, y]
 
-        return revised
+        #Keep words in x whose overlapping letter is the overlapping letter of some word in y
+        supported = 0
+        for letter in self.alphabet:
+            y_words = self.letters.get((y.length, y_overlap, letter), 0)
+            if self.domains[y] & y_words:
+                supported |= self.letters.get((x.length, x_overlap, letter), 0)
 
+        revised = self.domains[x] & supported
+        if revised == self.domains[x]:
+            return False
+        self.set_domain(x, revised)
+        return True
 
     def ac3(self, arcs=None):
         """
@@ -151,25 +224,31 @@ class CrosswordCreator():
         Return True if arc consistency is enforced and no domains are empty;
         return False if one or more domains end up empty.
         """
-        if arcs == None:
+        if arcs is None:
             arcs = []
             #Create all arcs between neighboring variables
             for variable in self.domains:
-                for variable2 in self.domains:
-                    if variable != variable2 and self.crossword.overlaps[variable,variable2] != None:
-                        arcs.append((variable,variable2))
+                for variable2 in self.crossword.neighbors(variable):
+                    arcs.append((variable, variable2))
+
+        #Queue of arcs still to check, each queued at most once at a time
+        queue = deque(arcs)
+        queued = set(queue)
+
         #for each arc, remove and check if consistent. If changes made, add new arcs accordingly
-        while len(arcs) > 0:
-            (X,Y) = arcs.pop(0)
+        while queue:
+            arc = queue.popleft()
+            queued.discard(arc)
+            X, Y = arc
             if self.revise(X, Y):
-                if len(self.domains[X]) ==0:
+                if not self.domains[X]:
                     return False
                 for Z in self.crossword.neighbors(X):
-                    if Z != Y:
-                        arcs.append((Z,X))
+                    if Z != Y and (Z, X) not in queued:
+                        queue.append((Z, X))
+                        queued.add((Z, X))
         return True
 
-
     def assignment_complete(self, assignment):
         """
         Return True if `assignment` is complete (i.e., assigns a value to each
@@ -186,15 +265,15 @@ class CrosswordCreator():
         Return True if `assignment` is consistent (i.e., words fit in crossword
         puzzle without conflicting characters); return False otherwise.
         """
+        #Check if duplicate words
+        if len(set(assignment.values())) != len(assignment):
+            return False
+
         for key in assignment:
             #Check if word is correct length
             if key.length != len(assignment[key]):
                 return False
 
-            #Check if duplicate words
-            if sum(x == assignment[key] for x in assignment.values())>1:
-                return False
-            
             #Check arc consistency 
             for neighbor in self.crossword.neighbors(key):
                 if neighbor in assignment:
@@ -207,6 +286,22 @@ class CrosswordCreator():
         return True
 
 
+    def consistent_value(self, var, value, assignment):
+        """
+        Return True if assigning `value` to `var` keeps a consistent
+        `assignment` consistent: the word must be the right length, not
+        already used, and agree with each assigned neighbor where they
+        overlap. Only `var` and its neighbors are checked.
+        """
+        if var.length != len(value) or value in self.used:
+            return False
+        for neighbor in self.crossword.neighbors(var):
+            if neighbor in assignment:
+                var_overlap, neighbor_overlap = self.crossword.overlaps[var, neighbor]
+                if value[var_overlap] != assignment[neighbor][neighbor_overlap]:
+                    return False
+        return True
+
     def order_domain_values(self, var, assignment):
         """
         Return a list of values in the domain of `var`, in order by
@@ -215,23 +310,28 @@ class CrosswordCreator():
         that rules out the fewest values among the neighbors of `var`.
         """
         #Create list will all words
-        list_var = list(self.domains[var])
-
+        list_var = self.words_in(self.domains[var])
+
+        #For each unassigned neighbor, count its remaining words by the letter where it overlaps var
+        histograms = []
+        for neighbor in self.crossword.neighbors(var):
+            if neighbor not in assignment:
+                key_space, neighbor_space = self.crossword.overlaps[var, neighbor]
+                neighbor_words = self.domains[neighbor]
+                histogram = {
+                    letter: (neighbor_words & self.letters.get((neighbor.length, neighbor_space, letter), 0)).bit_count()
+                    for letter in self.alphabet
+                }
+                histograms.append((key_space, neighbor_words.bit_count(), histogram))
+
+        #Count how many values get ruled out using each word: all neighbor words without its letter
         var_dict = {}
-        for word in self.domains[var]:
-            count = 0
-            #Create a count based on how many valuables get rules out using current word, add count to dictionary
-            for neighbor in self.crossword.neighbors(var):
-                if neighbor not in assignment:
-                    #print(neighbor)
-                    key_overlap =word[self.crossword.overlaps[var,neighbor][0]]
-                    for neighbor_word in self.domains[neighbor]:
-                        neighbor_space =self.crossword.overlaps[var,neighbor][1]
-                        neighbor_overlap = neighbor_word[neighbor_space]
-                        if key_overlap != neighbor_overlap:
-                            count+=1
-            var_dict[word]=count
-        
+        for word in list_var:
+            var_dict[word] = sum(
+                total - histogram[word[key_space]]
+                for key_space, total, histogram in histograms
+            )
+
         #Sort list based on dictionary value
         list_var.sort(key=lambda x: var_dict[x])
 
@@ -246,15 +346,30 @@ class CrosswordCreator():
         degree. If there is a tie, any of the tied variables are acceptable
         return values.
         """
-        variable_list = []
-        for variable in self.domains:
-            #add every variable not in assignment to new list
-            if variable not in assignment:
-                variable_list.append(variable)        
+        return min(
+            (variable for variable in self.domains if variable not in assignment),
+            key=lambda x: (self.domains[x].bit_count(), -len(self.crossword.neighbors(x)))
+        )
 
-        #Sort list but length of possible words, followed by number of neighbors
-        variable_list.sort(key=lambda x: (len(self.domains[x]),-1*(len(self.crossword.neighbors(x)))))
-        return variable_list[0]
+    def next_variable(self, assignment):
+        """
+        Return the variable select_unassigned_variable would, using the
+        queue that search keeps up to date rather than scanning every
+        variable.
+        """
+        while self.queue:
+            size, _, _, variable = self.queue[0]
+            if variable not in assignment and size == self.domains[variable].bit_count():
+                return variable
+
+            #Search pushes variables again when it unassigns them, so entries for
+            #assigned variables and for domains that have changed size since can go
+            heapq.heappop(self.queue)
+
+        #Rebuild the queue if it runs out
+        for variable in self.domains:
+            self.prioritize(variable)
+        return self.select_unassigned_variable(assignment)
 
     def backtrack(self, assignment):
         """
@@ -265,24 +380,46 @@ class CrosswordCreator():
 
         If no assignment is possible, return None.
         """
- 
+        self.used = set(assignment.values())
+        self.queue = []
+        for variable in self.domains:
+            self.prioritize(variable)
+        return self.search(assignment)
+
+    def search(self, assignment):
+        """
+        Backtracking search that extends `assignment` in place, with
+        `self.used` holding the words it uses. If no complete assignment
+        is found, return None with `assignment` and `self.used` as they were.
+        """
         if self.assignment_complete(assignment):
             return assignment
 
-        var = self.select_unassigned_variable(assignment)
+        var = self.next_variable(assignment)
         for value in self.order_domain_values(var, assignment):
-            test_assignment = assignment.copy()
-            test_assignment[var]=value
-            if self.consistent(test_assignment):
-                assignment = test_assignment.copy()
-                result = self.backtrack(assignment)
-                if result != None:
-                    return result
+            if self.consistent_value(var, value, assignment):
+                assignment[var] = value
+                self.used.add(value)
+
+                #Maintain arc consistency: narrow var to its value, and prune
+                #neighbors against it, undoing the changes if this value fails
+                mark = len(self.trail)
+                self.set_domain(var, 1 << self.index[value])
+                arcs = [
+                    (neighbor, var) for neighbor in self.crossword.neighbors(var)
+                    if neighbor not in assignment
+                ]
+                if self.ac3(arcs):
+                    result = self.search(assignment)
+                    if result is not None:
+                        return result
+                self.undo(mark)
+                self.used.discard(value)
                 del assignment[var]
+                self.prioritize(var)
         return None
 
 
-
 def main():
 
     # Check usage